@@ -5,6 +5,7 @@ This package contains reusable utilities:
 - config: Centralized paths and configuration
 - geo: Geocoding, elevation lookup, distance calculations
 - colors: Altitude-based color mapping
+- jsonio: JSON encoding, using orjson when installed
 """
 
 from .config import *
@@ -2,8 +2,9 @@
 Core ADS-B parsing and state tracking utilities.
 
 This module contains reusable pieces for reading SBS-1/BaseStation lines,
-merging partial messages into a per-aircraft state, and producing position
-records ready for storage or exposure via APIs.
+merging partial messages into a per-aircraft state, producing position
+records ready for storage or exposure via APIs, and merging stored position
+histories without duplicate fixes.
 
 It is intentionally light on I/O so callers can reuse the logic in
 different contexts (CSV logger, DB writer, API server, tests).
@@ -11,16 +12,23 @@ different contexts (CSV logger, DB writer, API server, tests).
 
 from __future__ import annotations
 
+import math
+import sys
 import time
+from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 EVENT_TYPE = "adsb.position.v1"
 
+# Per-message records use __slots__ where dataclasses support it (3.10+):
+# no per-instance __dict__ and faster attribute access
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class ParsedMessage:
     """Structured representation of a single SBS-1 line."""
 
@@ -48,14 +56,13 @@ class ParsedMessage:
         return self.callsign
 
 
-def _parse_flag(value: str) -> Optional[bool]:
-    """Convert SBS flag fields (0/1) to booleans."""
-    value = value.strip()
-    if value == "1":
-        return True
-    if value == "0":
-        return False
-    return None
+# SBS flag fields (0/1) as booleans; anything else is unknown
+_FLAG_VALUES = {"1": True, "0": False}
+
+# Fields in an SBS-1 MSG line; shorter lines are padded so every field can be
+# read without a length check
+_SBS_FIELD_COUNT = 22
+_SBS_PADDING = [""] * _SBS_FIELD_COUNT
 
 
 def parse_sbs_line(line: str) -> Optional[ParsedMessage]:
@@ -73,89 +80,118 @@ def parse_sbs_line(line: str) -> Optional[ParsedMessage]:
     # Must be a MSG line with an ICAO code
     if len(fields) < 5:
         return None
-
-    message_type = fields[0].strip()
-    if message_type != "MSG":
+    if fields[0].strip() != "MSG":
         return None
 
-    transmission_type: Optional[int] = None
-    if len(fields) > 1 and fields[1].strip():
-        try:
-            transmission_type = int(fields[1])
-        except ValueError:
-            transmission_type = None
-
     icao = fields[4].strip().upper()
     if not icao:
         return None
 
-    parsed = ParsedMessage(raw=raw_line, message_type=message_type, transmission_type=transmission_type, icao=icao)
+    if len(fields) < _SBS_FIELD_COUNT:
+        fields += _SBS_PADDING[len(fields):]
+
+    transmission_type: Optional[int] = None
+    value = fields[1]
+    if value and not value.isspace():
+        try:
+            transmission_type = int(value)
+        except ValueError:
+            pass
 
     # Callsign / flight
-    if len(fields) > 10 and fields[10].strip():
-        parsed.callsign = fields[10].strip()
+    callsign = fields[10].strip() or None
 
     # Altitude (ft)
-    if len(fields) > 11 and fields[11].strip():
+    altitude_ft = None
+    value = fields[11]
+    if value and not value.isspace():
         try:
-            parsed.altitude_ft = int(float(fields[11]))
+            altitude_ft = int(float(value))
         except ValueError:
             pass
 
     # Ground speed (kts)
-    if len(fields) > 12 and fields[12].strip():
+    ground_speed_kts = None
+    value = fields[12]
+    if value and not value.isspace():
         try:
-            parsed.ground_speed_kts = float(fields[12])
+            ground_speed_kts = float(value)
         except ValueError:
             pass
 
     # Track / heading (deg)
-    if len(fields) > 13 and fields[13].strip():
+    track_deg = None
+    value = fields[13]
+    if value and not value.isspace():
         try:
-            parsed.track_deg = float(fields[13])
+            track_deg = float(value)
         except ValueError:
             pass
 
     # Position
-    if len(fields) > 15:
-        lat_str = fields[14].strip()
-        lon_str = fields[15].strip()
+    lat = lon = None
+    has_position = False
+    lat_str = fields[14]
+    lon_str = fields[15]
+    if lat_str and lon_str and not lat_str.isspace() and not lon_str.isspace():
         try:
-            if lat_str and lon_str:
-                lat = float(lat_str)
-                lon = float(lon_str)
-                if -90 <= lat <= 90 and -180 <= lon <= 180:
-                    parsed.lat = lat
-                    parsed.lon = lon
-                    parsed.has_position = True
+            lat_value = float(lat_str)
+            lon_value = float(lon_str)
+            if -90 <= lat_value <= 90 and -180 <= lon_value <= 180:
+                lat, lon, has_position = lat_value, lon_value, True
         except ValueError:
             pass
 
     # Vertical rate
-    if len(fields) > 16 and fields[16].strip():
+    vertical_rate_fpm = None
+    value = fields[16]
+    if value and not value.isspace():
         try:
-            parsed.vertical_rate_fpm = int(float(fields[16]))
+            vertical_rate_fpm = int(float(value))
         except ValueError:
             pass
 
-    # Squawk
-    if len(fields) > 17 and fields[17].strip():
-        parsed.squawk = fields[17].strip()
-
     # Flags (alert, emergency, SPI, on ground)
-    if len(fields) > 18 and fields[18].strip():
-        parsed.alert = _parse_flag(fields[18])
-    if len(fields) > 19 and fields[19].strip():
-        parsed.emergency = _parse_flag(fields[19])
-    if len(fields) > 20 and fields[20].strip():
-        parsed.spi = _parse_flag(fields[20])
-    if len(fields) > 21 and fields[21].strip():
-        parsed.on_ground = _parse_flag(fields[21])
+    flags = _FLAG_VALUES
+    return ParsedMessage(
+        raw=raw_line,
+        message_type="MSG",
+        transmission_type=transmission_type,
+        icao=icao,
+        callsign=callsign,
+        lat=lat,
+        lon=lon,
+        altitude_ft=altitude_ft,
+        ground_speed_kts=ground_speed_kts,
+        track_deg=track_deg,
+        vertical_rate_fpm=vertical_rate_fpm,
+        squawk=fields[17].strip() or None,
+        alert=flags.get(fields[18].strip()),
+        emergency=flags.get(fields[19].strip()),
+        spi=flags.get(fields[20].strip()),
+        on_ground=flags.get(fields[21].strip()),
+        has_position=has_position,
+    )
+
+
+def parse_sbs_lines(lines: Iterable[str]) -> Iterator[ParsedMessage]:
+    """
+    Parse a batch or stream of SBS-1 lines, yielding only usable messages.
 
-    return parsed
+    Non-MSG records (SEL, ID, AIR, STA, CLK) and blank lines make up a good
+    share of a BaseStation feed; they are rejected with a prefix check before
+    any stripping or splitting.
+    """
+    parse = parse_sbs_line
+    for line in lines:
+        if not line.startswith("MSG") and not line.lstrip().startswith("MSG"):
+            continue
+        parsed = parse(line)
+        if parsed is not None:
+            yield parsed
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class AircraftState:
     """Tracks the latest known data for a single aircraft."""
 
@@ -236,12 +272,18 @@ class AircraftStateTracker:
             if value is not None:
                 setattr(state, attr, bool(value))
 
-    def update(self, msg: ParsedMessage) -> Tuple[Optional[Dict[str, Any]], bool]:
+    def update(self, msg: ParsedMessage, now_iso: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Merge msg into its aircraft's state.
+
+        now_iso is the UTC ISO timestamp stored as last_update; callers that
+        already format one per message (or per batch) pass it to avoid a
+        second datetime.now().isoformat() call.
+        """
         state = self._state.get(msg.icao)
         if state is None:
-            state = AircraftState(icao=msg.icao)
+            state = self._state[msg.icao] = AircraftState(icao=msg.icao)
             self._apply_aircraft_info(state)
-            self._state[msg.icao] = state
 
         if msg.flight:
             state.flight = msg.flight
@@ -268,7 +310,7 @@ class AircraftStateTracker:
         if msg.on_ground is not None:
             state.on_ground = msg.on_ground
 
-        state.last_update = datetime.now(timezone.utc).isoformat()
+        state.last_update = now_iso or datetime.now(timezone.utc).isoformat()
 
         position = state.as_position()
         has_full_velocity = position is not None and state.speed_kts is not None and state.heading_deg is not None
@@ -284,16 +326,81 @@ class AircraftStateTracker:
         Only includes aircraft with a valid position.
         """
         snapshot: Dict[str, Dict[str, Any]] = {}
+        fallback_timestamp = None
         for icao, state in self._state.items():
             position = state.as_position()
-            if position:
-                snapshot[icao] = {
-                    **position,
-                    "timestamp_utc": state.last_update or datetime.now(timezone.utc).isoformat(),
-                }
+            if position is None:
+                continue
+            # as_position() builds a fresh dict, so the timestamp goes straight in
+            timestamp_utc = state.last_update
+            if not timestamp_utc:
+                if fallback_timestamp is None:
+                    fallback_timestamp = datetime.now(timezone.utc).isoformat()
+                timestamp_utc = fallback_timestamp
+            position["timestamp_utc"] = timestamp_utc
+            snapshot[icao] = position
         return snapshot
 
 
+# Points of one aircraft closer than this in both lat and lon are the same fix
+_DUPLICATE_TOLERANCE_DEG = 0.0001
+
+
+class PositionIndex:
+    """
+    Hash index of positions on a grid of cells twice the duplicate tolerance.
+
+    A point within the tolerance of another always lands in the same or an
+    adjacent cell, so a lookup checks at most nine small buckets instead of
+    scanning every position.
+    """
+
+    _CELL_DEG = 2 * _DUPLICATE_TOLERANCE_DEG
+
+    def __init__(self, positions: Iterable[Dict[str, Any]] = ()):
+        self._cells = defaultdict(list)
+        for p in positions:
+            self.add(p)
+
+    def add(self, p: Dict[str, Any]) -> None:
+        lat, lon = p["lat"], p["lon"]
+        key = (p["icao"], math.floor(lat / self._CELL_DEG), math.floor(lon / self._CELL_DEG))
+        self._cells[key].append((lat, lon))
+
+    def has_near(self, p: Dict[str, Any]) -> bool:
+        """True if the index holds a point of the same aircraft within the tolerance."""
+        icao, lat, lon = p["icao"], p["lat"], p["lon"]
+        cell_lat = math.floor(lat / self._CELL_DEG)
+        cell_lon = math.floor(lon / self._CELL_DEG)
+        cells = self._cells
+        for d_lat in (-1, 0, 1):
+            for d_lon in (-1, 0, 1):
+                for other_lat, other_lon in cells.get((icao, cell_lat + d_lat, cell_lon + d_lon), ()):
+                    if abs(other_lat - lat) < _DUPLICATE_TOLERANCE_DEG and abs(other_lon - lon) < _DUPLICATE_TOLERANCE_DEG:
+                        return True
+        return False
+
+
+def merge_historical_positions(positions: List[Dict[str, Any]], historical_positions: Iterable[Dict[str, Any]],
+                               icaos: Optional[set] = None, keep_others: bool = False) -> None:
+    """
+    Append historical points to positions in place, skipping points that
+    duplicate one already present for the same aircraft.
+
+    With icaos, only those aircraft are merged this way; points of other
+    aircraft are dropped, or appended unchecked with keep_others.
+    """
+    index = PositionIndex(positions)
+    for hist_pos in historical_positions:
+        if icaos is not None and hist_pos["icao"] not in icaos:
+            if keep_others:
+                positions.append(hist_pos)
+            continue
+        if not index.has_near(hist_pos):
+            positions.append(hist_pos)
+            index.add(hist_pos)
+
+
 def _drop_none(values: Dict[str, Any]) -> Dict[str, Any]:
     """Utility to strip None values while retaining valid falsy values like False/0."""
     return {k: v for k, v in values.items() if v is not None}
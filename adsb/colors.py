@@ -5,7 +5,9 @@ Provides consistent color mapping for aircraft visualization
 based on altitude, used in both Python (folium) and JavaScript.
 """
 
-from typing import Optional, Tuple
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
 
 
 # Color stops: (altitude_ft, hex_color, folium_color_name)
@@ -20,6 +22,40 @@ ALTITUDE_COLOR_STOPS = [
 ]
 
 
+# Folium color names need no interpolation: each altitude takes the name of
+# the nearest stop, so the switch happens halfway between consecutive stops.
+_COLOR_NAME_BOUNDARIES = [
+    (ALTITUDE_COLOR_STOPS[i][0] + ALTITUDE_COLOR_STOPS[i + 1][0]) / 2
+    for i in range(len(ALTITUDE_COLOR_STOPS) - 1)
+]
+_COLOR_NAMES = [name for _, _, name in ALTITUDE_COLOR_STOPS]
+
+
+def get_altitude_colors(altitudes: Iterable[Optional[float]]) -> List[str]:
+    """
+    Get folium color names for a batch of altitudes.
+
+    Each lookup is a binary search over the precomputed stop boundaries,
+    so coloring a whole trajectory costs one call.
+
+    Args:
+        altitudes: Altitudes in feet, None entries for unknown
+
+    Returns:
+        Folium color names in the same order ("gray" for unknown)
+    """
+    boundaries = _COLOR_NAME_BOUNDARIES
+    names = _COLOR_NAMES
+    # altitude_ft != altitude_ft catches NaN from pandas-parsed input, which
+    # compares false against every boundary
+    return [
+        "gray" if altitude_ft is None or altitude_ft != altitude_ft
+        else names[bisect_right(boundaries, altitude_ft)]
+        for altitude_ft in altitudes
+    ]
+
+
+@lru_cache(maxsize=1024)
 def get_altitude_color(altitude_ft: Optional[int]) -> str:
     """
     Get folium color name based on altitude.
@@ -32,27 +68,7 @@ def get_altitude_color(altitude_ft: Optional[int]) -> str:
     Returns:
         Folium color name (e.g., "orange", "green", "blue")
     """
-    if altitude_ft is None:
-        return "gray"
-
-    # Find the segment
-    if altitude_ft <= ALTITUDE_COLOR_STOPS[0][0]:
-        return ALTITUDE_COLOR_STOPS[0][2]
-    if altitude_ft >= ALTITUDE_COLOR_STOPS[-1][0]:
-        return ALTITUDE_COLOR_STOPS[-1][2]
-
-    # Interpolate between stops (using midpoint)
-    for i in range(len(ALTITUDE_COLOR_STOPS) - 1):
-        if ALTITUDE_COLOR_STOPS[i][0] <= altitude_ft <= ALTITUDE_COLOR_STOPS[i + 1][0]:
-            alt1 = ALTITUDE_COLOR_STOPS[i][0]
-            alt2 = ALTITUDE_COLOR_STOPS[i + 1][0]
-            ratio = (altitude_ft - alt1) / (alt2 - alt1)
-            if ratio < 0.5:
-                return ALTITUDE_COLOR_STOPS[i][2]
-            else:
-                return ALTITUDE_COLOR_STOPS[i + 1][2]
-
-    return "gray"
+    return get_altitude_colors((altitude_ft,))[0]
 
 
 def get_altitude_hex_color(altitude_ft: Optional[int]) -> str:
@@ -67,24 +83,25 @@ def get_altitude_hex_color(altitude_ft: Optional[int]) -> str:
     Returns:
         Hex color string (e.g., "#FF8C00")
     """
-    if altitude_ft is None:
+    if altitude_ft is None or altitude_ft != altitude_ft:  # unknown or NaN
         return "#808080"  # gray
 
-    if altitude_ft <= ALTITUDE_COLOR_STOPS[0][0]:
+    if altitude_ft <= _STOP_ALTITUDES[0]:
         return ALTITUDE_COLOR_STOPS[0][1]
-    if altitude_ft >= ALTITUDE_COLOR_STOPS[-1][0]:
+    if altitude_ft >= _STOP_ALTITUDES[-1]:
         return ALTITUDE_COLOR_STOPS[-1][1]
 
-    # Find the segment and interpolate
-    for i in range(len(ALTITUDE_COLOR_STOPS) - 1):
-        alt1, hex1, _ = ALTITUDE_COLOR_STOPS[i]
-        alt2, hex2, _ = ALTITUDE_COLOR_STOPS[i + 1]
-
-        if alt1 <= altitude_ft <= alt2:
-            ratio = (altitude_ft - alt1) / (alt2 - alt1)
-            return _interpolate_hex_colors(hex1, hex2, ratio)
+    # Binary search for the segment, then interpolate its precomputed RGB ends
+    i = bisect_right(_STOP_ALTITUDES, altitude_ft) - 1
+    alt1, alt2 = _STOP_ALTITUDES[i], _STOP_ALTITUDES[i + 1]
+    ratio = (altitude_ft - alt1) / (alt2 - alt1)
+    (r1, g1, b1), (r2, g2, b2) = _STOP_RGB[i], _STOP_RGB[i + 1]
 
-    return "#808080"
+    return _rgb_to_hex(
+        int(r1 + (r2 - r1) * ratio),
+        int(g1 + (g2 - g1) * ratio),
+        int(b1 + (b2 - b1) * ratio),
+    )
 
 
 def _hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
@@ -98,26 +115,8 @@ def _rgb_to_hex(r: int, g: int, b: int) -> str:
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
-def _interpolate_hex_colors(color1: str, color2: str, ratio: float) -> str:
-    """
-    Interpolate between two hex colors.
-
-    Args:
-        color1: Starting hex color
-        color2: Ending hex color
-        ratio: Interpolation ratio (0.0 = color1, 1.0 = color2)
-
-    Returns:
-        Interpolated hex color
-    """
-    r1, g1, b1 = _hex_to_rgb(color1)
-    r2, g2, b2 = _hex_to_rgb(color2)
-
-    r = int(r1 + (r2 - r1) * ratio)
-    g = int(g1 + (g2 - g1) * ratio)
-    b = int(b1 + (b2 - b1) * ratio)
-
-    return _rgb_to_hex(r, g, b)
+_STOP_ALTITUDES = [alt for alt, _, _ in ALTITUDE_COLOR_STOPS]
+_STOP_RGB = [_hex_to_rgb(hex_color) for _, hex_color, _ in ALTITUDE_COLOR_STOPS]
 
 
 def get_altitude_color_js() -> str:
@@ -127,56 +126,48 @@ def get_altitude_color_js() -> str:
     Returns the JavaScript code as a string to be embedded in HTML.
     This ensures Python and JavaScript use the same color logic.
     """
-    # Build color stops array for JavaScript
-    stops_js = ",\n            ".join(
-        f"[{alt}, '{hex_color}']"
-        for alt, hex_color, _ in ALTITUDE_COLOR_STOPS
+    # Color stops with RGB components resolved up front, so the browser
+    # does not parse hex strings on every lookup
+    stops_js = ",\n        ".join(
+        f"[{alt}, [{r}, {g}, {b}], '{hex_color}']"
+        for (alt, hex_color, _), (r, g, b) in zip(ALTITUDE_COLOR_STOPS, _STOP_RGB)
     )
 
     return f'''
-    function getAltitudeColor(altitude_ft) {{
-        if (altitude_ft === null || altitude_ft === undefined) return '#808080';
-
-        const colorStops = [
-            {stops_js}
-        ];
-
-        function hexToRgb(hex) {{
-            const result = /^#?([a-f\\d]{{2}})([a-f\\d]{{2}})([a-f\\d]{{2}})$/i.exec(hex);
-            return result ? {{
-                r: parseInt(result[1], 16),
-                g: parseInt(result[2], 16),
-                b: parseInt(result[3], 16)
-            }} : null;
+    const ALTITUDE_COLOR_STOPS = [
+        {stops_js}
+    ];
+    const altitudeColorCache = new Map();
+
+    function computeAltitudeColor(altitude_ft) {{
+        const stops = ALTITUDE_COLOR_STOPS;
+        const last = stops.length - 1;
+        if (altitude_ft <= stops[0][0]) return stops[0][2];
+        if (altitude_ft >= stops[last][0]) return stops[last][2];
+
+        // Binary search for the segment containing the altitude
+        let lo = 0, hi = last;
+        while (hi - lo > 1) {{
+            const mid = (lo + hi) >> 1;
+            if (stops[mid][0] <= altitude_ft) lo = mid; else hi = mid;
         }}
+        const alt1 = stops[lo][0], alt2 = stops[hi][0];
+        const ratio = (altitude_ft - alt1) / (alt2 - alt1);
+        const rgb1 = stops[lo][1], rgb2 = stops[hi][1];
+        return '#' + [0, 1, 2].map(k => {{
+            const hex = Math.round(rgb1[k] + (rgb2[k] - rgb1[k]) * ratio).toString(16);
+            return hex.length === 1 ? '0' + hex : hex;
+        }}).join('');
+    }}
 
-        function rgbToHex(r, g, b) {{
-            return '#' + [r, g, b].map(x => {{
-                const hex = Math.round(x).toString(16);
-                return hex.length === 1 ? '0' + hex : hex;
-            }}).join('');
-        }}
-
-        function interpolateColor(color1, color2, ratio) {{
-            const rgb1 = hexToRgb(color1);
-            const rgb2 = hexToRgb(color2);
-            if (!rgb1 || !rgb2) return color1;
-
-            const r = rgb1.r + (rgb2.r - rgb1.r) * ratio;
-            const g = rgb1.g + (rgb2.g - rgb1.g) * ratio;
-            const b = rgb1.b + (rgb2.b - rgb1.b) * ratio;
-            return rgbToHex(r, g, b);
-        }}
-
-        if (altitude_ft <= colorStops[0][0]) return colorStops[0][1];
-        if (altitude_ft >= colorStops[colorStops.length - 1][0]) return colorStops[colorStops.length - 1][1];
-
-        for (let i = 0; i < colorStops.length - 1; i++) {{
-            if (altitude_ft >= colorStops[i][0] && altitude_ft <= colorStops[i + 1][0]) {{
-                const ratio = (altitude_ft - colorStops[i][0]) / (colorStops[i + 1][0] - colorStops[i][0]);
-                return interpolateColor(colorStops[i][1], colorStops[i + 1][1], ratio);
-            }}
+    function getAltitudeColor(altitude_ft) {{
+        if (altitude_ft === null || altitude_ft === undefined) return '#808080';
+        // Altitudes repeat across segments and refreshes, memoize the result
+        let color = altitudeColorCache.get(altitude_ft);
+        if (color === undefined) {{
+            color = computeAltitudeColor(altitude_ft);
+            altitudeColorCache.set(altitude_ft, color);
         }}
-        return '#808080';
+        return color;
     }}
     '''
@@ -6,6 +6,7 @@ Includes:
 - Elevation lookup (via Open-Elevation API)
 - Distance calculations (haversine, 3D)
 - Bearing calculation
+- Path simplification (Douglas-Peucker)
 - Home location management
 """
 
@@ -13,7 +14,7 @@ import json
 import math
 import os
 import sys
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 import urllib.request
 import urllib.parse
 
@@ -150,6 +151,55 @@ def calculate_3d_distance(lat1: float, lon1: float, alt1_m: float,
     return distance_3d_km
 
 
+def simplify_path_indices(points: Sequence[Tuple[float, float]], tolerance: float) -> List[int]:
+    """
+    Simplify a path with the Douglas-Peucker algorithm.
+
+    Points are treated as planar (lat, lon) pairs, which is accurate enough
+    for choosing what to draw at a given zoom level.
+
+    Args:
+        points: Path vertices as (lat, lon)
+        tolerance: Largest allowed deviation from the original path, in degrees
+
+    Returns:
+        Indices of the kept points in order; the first and last are always kept
+    """
+    n = len(points)
+    if n < 3:
+        return list(range(n))
+
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        lat1, lon1 = points[first]
+        d_lat = points[last][0] - lat1
+        d_lon = points[last][1] - lon1
+        length_sq = d_lat * d_lat + d_lon * d_lon
+        max_dist_sq = tolerance_sq
+        index = None
+        for i in range(first + 1, last):
+            lat, lon = points[i]
+            # Squared distance to the closest point of segment first-last
+            t = ((lat - lat1) * d_lat + (lon - lon1) * d_lon) / length_sq if length_sq else 0.0
+            t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+            e_lat = lat - lat1 - t * d_lat
+            e_lon = lon - lon1 - t * d_lon
+            dist_sq = e_lat * e_lat + e_lon * e_lon
+            if dist_sq > max_dist_sq:
+                max_dist_sq = dist_sq
+                index = i
+        if index is not None:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [i for i in range(n) if keep[i]]
+
+
 def setup_home_location() -> Optional[dict]:
     """
     Interactive setup for home location.
@@ -0,0 +1,39 @@
+"""
+JSON encoding helpers for ADS-B tracker.
+
+Uses orjson, a C encoder several times faster than the json module on large
+position payloads, when it is installed and falls back to json otherwise.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# NumPy scalars and arrays (e.g. from the pandas CSV reader) encode directly
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode NumPy values with the json module, matching orjson's option."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 encoded JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    """Serialize obj to a compact JSON string."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=_json_default)
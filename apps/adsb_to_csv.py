@@ -166,10 +166,11 @@ def main():
                     try:
                         parsed_msg = parse_sbs_line(line)
                         if parsed_msg:
-                            position, _has_full_velocity = tracker.update(parsed_msg)
+                            # One timestamp for both the tracker state and the CSV row
+                            timestamp_utc = datetime.now(timezone.utc).isoformat()
+                            position, _has_full_velocity = tracker.update(parsed_msg, timestamp_utc)
 
                             if position:
-                                timestamp_utc = datetime.now(timezone.utc).isoformat()
                                 position_with_ts = {**position, "timestamp_utc": timestamp_utc}
 
                                 # Write to historical CSV even if we do not yet have velocity
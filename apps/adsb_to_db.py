@@ -30,7 +30,7 @@ except ImportError:  # pragma: no cover
 import psycopg2
 import psycopg2.extras
 
-from adsb.adsb import AircraftStateTracker, ParsedMessage, parse_sbs_line
+from adsb.adsb import AircraftStateTracker, parse_sbs_lines
 from adsb.config import (
     CSV_COLUMNS,
     FLUSH_INTERVAL,
@@ -170,11 +170,7 @@ def stream_from_dump1090(db_url: str, batch_size: int = 100) -> None:
             sock = connect_to_dump1090(host, port)
             with sock.makefile("r", encoding="utf-8", errors="replace") as f:
                 print("Reading SBS-1 stream... (Ctrl+C to stop)")
-                for line in f:
-                    parsed: Optional[ParsedMessage] = parse_sbs_line(line)
-                    if not parsed:
-                        continue
-
+                for parsed in parse_sbs_lines(f):
                     position, _has_full = tracker.update(parsed)
                     if position:
                         ts = datetime.now(timezone.utc)
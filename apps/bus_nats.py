@@ -8,12 +8,13 @@ the connection open for higher throughput senders.
 from __future__ import annotations
 
 import asyncio
-import json
 import os
 from typing import Any, Dict, Optional
 
 from nats.aio.client import Client as NATS
 
+from adsb.jsonio import dumps_bytes
+
 DEFAULT_NATS_URL = os.getenv("ADSB_NATS_URL", "nats://localhost:4222")
 DEFAULT_SUBJECT = os.getenv("ADSB_NATS_SUBJECT", "adsb.position.v1")
 
@@ -30,7 +31,7 @@ async def publish_event(event: Dict[str, Any], nats_url: Optional[str] = None, s
     nc = NATS()
     await nc.connect(servers=[nats_url])
 
-    payload = json.dumps(event).encode("utf-8")
+    payload = dumps_bytes(event)
     await nc.publish(subject, payload)
     await nc.flush()
     await nc.drain()
@@ -56,7 +57,7 @@ class NatsPublisher:
     async def publish(self, event: Dict[str, Any]) -> None:
         if not self._connected:
             await self.connect()
-        payload = json.dumps(event).encode("utf-8")
+        payload = dumps_bytes(event)
         await self._nc.publish(self.subject, payload)
 
     async def close(self) -> None:
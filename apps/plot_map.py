@@ -14,11 +14,19 @@ Usage:
 
 import argparse
 import csv
-import json
+import hashlib
+import io
+import math
 import os
+import struct
 import sys
+from array import array
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Dict, Any, Optional
 
 try:
     from . import _bootstrap  # noqa: F401
@@ -27,15 +35,17 @@ except ImportError:  # pragma: no cover
 
 # Import shared modules
 from adsb.config import (
-    PROJECT_ROOT, OUTPUT_DIR, ICONS_DIR,
+    PROJECT_ROOT, OUTPUT_DIR, ICONS_DIR, CSV_COLUMNS,
     get_history_csv_path, get_current_csv_path,
     DEFAULT_MAP_HTML, DEFAULT_CURRENT_MAP_HTML,
 )
 from adsb.geo import (
     get_home_location, set_home_from_address, setup_home_location,
-    calculate_bearing, calculate_3d_distance,
+    calculate_bearing, calculate_3d_distance, simplify_path_indices,
 )
-from adsb.colors import get_altitude_color, get_altitude_color_js
+from adsb.adsb import PositionIndex, merge_historical_positions
+from adsb.colors import get_altitude_colors, get_altitude_color_js
+from adsb.jsonio import dumps as json_dumps, dumps_bytes
 
 # Import aircraft database
 try:
@@ -46,41 +56,233 @@ except ImportError:
     print("Warning: aircraft_db module not available, using default icons", file=sys.stderr)
 
 
-def read_csv_positions(csv_path) -> List[Dict[str, Any]]:
-    """Read positions from a CSV file."""
-    positions = []
+# Below this size the cost of starting worker processes outweighs the gain
+_PARALLEL_MIN_BYTES = 8 * 1024 * 1024
 
+
+def read_csv_positions(csv_path, chunksize: Optional[int] = None,
+                       workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Read positions from a CSV file.
+
+    With workers > 1, large files are split into newline-aligned byte ranges
+    that are parsed in separate processes and concatenated in file order.
+    """
+    if workers and workers > 1 and os.path.exists(csv_path) \
+            and os.path.getsize(csv_path) >= _PARALLEL_MIN_BYTES:
+        return _read_csv_positions_parallel(csv_path, workers)
+    return list(iter_csv_positions(csv_path, chunksize))
+
+
+def _csv_byte_ranges(csv_path, parts: int) -> List[tuple]:
+    """Split the data rows of a CSV into up to `parts` newline-aligned byte ranges."""
+    size = os.path.getsize(csv_path)
+    with open(csv_path, "rb") as f:
+        f.readline()  # header
+        bounds = [f.tell()]
+        data_size = size - bounds[0]
+        for i in range(1, parts):
+            # Step back one byte so a target that already starts a line is kept
+            f.seek(max(bounds[0] + data_size * i // parts - 1, bounds[-1]))
+            f.readline()
+            bounds.append(max(f.tell(), bounds[-1]))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _read_csv_byte_range(csv_path, start: int, end: int) -> List[Dict[str, Any]]:
+    """Parse one byte range of a CSV (worker process entry point)."""
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        f.seek(start)
+        data = f.read(end - start)
+    return parse_csv_bytes(header + data, f"{csv_path} (bytes {start}-{end})")
+
+
+def parse_csv_bytes(data: bytes, label: str) -> List[Dict[str, Any]]:
+    """Parse positions from CSV content already in memory, header line included."""
+    source = io.StringIO(data.decode("utf-8"))
+    try:
+        import numpy as np
+        import pandas as pd
+    except ImportError:
+        return list(_iter_csv_rows_stdlib(source, label))
+    return list(_iter_csv_positions_pandas(np, pd, source, None, label=label))
+
+
+def _read_csv_positions_parallel(csv_path, workers: int) -> List[Dict[str, Any]]:
+    """Parse a CSV across worker processes; rows keep their file order."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = _csv_byte_ranges(csv_path, workers)
+    positions: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges) or 1)) as executor:
+        futures = [executor.submit(_read_csv_byte_range, csv_path, start, end) for start, end in ranges]
+        for future in futures:
+            positions.extend(future.result())
+    return positions
+
+
+def iter_csv_positions(csv_path, chunksize: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield positions from a CSV file.
+
+    Uses pandas' C parser when available and falls back to the csv module.
+    With chunksize set, pandas parses at most that many rows at a time so
+    large histories can be streamed without loading the whole file.
+    """
     if not os.path.exists(csv_path):
         print(f"Error: CSV file not found: {csv_path}", file=sys.stderr)
-        return positions
+        return
+
+    try:
+        import numpy as np
+        import pandas as pd
+    except ImportError:
+        yield from _iter_csv_positions_stdlib(csv_path)
+        return
 
+    yield from _iter_csv_positions_pandas(np, pd, csv_path, chunksize)
+
+
+_NUMERIC_CSV_COLUMNS = ("lat", "lon", "altitude_ft", "speed_kts", "heading_deg")
+
+
+def _read_csv_frames(pd, csv_path, numeric_dtype, chunksize: Optional[int]) -> Iterator[Any]:
+    """Load the position columns, keeping text columns as (possibly empty) strings."""
+    options = dict(
+        dtype={c: numeric_dtype if c in _NUMERIC_CSV_COLUMNS else object for c in CSV_COLUMNS},
+        keep_default_na=False,
+        na_values={c: [""] for c in _NUMERIC_CSV_COLUMNS},
+        usecols=lambda c: c in CSV_COLUMNS,
+        # Rows with extra fields would otherwise turn the first column into the index
+        index_col=False,
+        encoding="utf-8",
+        on_bad_lines="warn",
+    )
+    if hasattr(csv_path, "seek"):
+        csv_path.seek(0)  # in-memory buffers are read again on the text fallback
+    if chunksize is None:
+        yield pd.read_csv(csv_path, **options)
+        return
+    with pd.read_csv(csv_path, chunksize=chunksize, **options) as reader:
+        yield from reader
+
+
+def _iter_csv_positions_pandas(np, pd, csv_path, chunksize: Optional[int],
+                               label: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Vectorized CSV reader; yields the same records as the csv module path."""
+    label = label or csv_path
+    numeric_dtype = "float64"
+    frames = _read_csv_frames(pd, csv_path, numeric_dtype, chunksize)
+    rows_done = 0
+    rows_to_skip = 0
+
+    while True:
+        try:
+            df = next(frames)
+        except (StopIteration, pd.errors.EmptyDataError):
+            # A zero-byte file, e.g. the current CSV caught mid-rewrite
+            return
+        except ValueError:
+            if numeric_dtype is object:
+                raise
+            # A malformed numeric cell: re-read as text and coerce per column,
+            # skipping the rows that were already yielded.
+            numeric_dtype = object
+            frames = _read_csv_frames(pd, csv_path, numeric_dtype, chunksize)
+            rows_to_skip, rows_done = rows_done, 0
+            continue
+
+        if rows_to_skip:
+            skipped = min(rows_to_skip, len(df))
+            df = df.iloc[skipped:]
+            rows_to_skip -= skipped
+            rows_done += skipped
+
+        yield from _frame_to_positions(np, pd, df, label, first_row=rows_done + 2)
+        rows_done += len(df)
+
+
+def _frame_to_positions(np, pd, df, csv_path, first_row: int) -> List[Dict[str, Any]]:
+    """Convert a frame from _read_csv_frames into position dicts."""
+    df = df.reset_index(drop=True).reindex(columns=CSV_COLUMNS)
+    for col in ("timestamp_utc", "icao", "flight", "squawk"):
+        # Columns missing from a short header come back as all-NaN floats
+        df[col] = df[col].fillna("").astype(object)
+
+    numeric = {}
+    invalid = pd.Series(False, index=df.index)
+    for col in _NUMERIC_CSV_COLUMNS:
+        values = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        if df[col].dtype == object:
+            missing = values.isna() & df[col].notna()
+            # Blank cells are allowed, anything else that failed to parse is not
+            invalid[missing] |= df.loc[missing, col].str.strip().ne("")
+        numeric[col] = values
+
+    present = numeric["lat"].notna() & numeric["lon"].notna()
+    required = df["icao"].ne("") & (present | invalid)
+    for row_num in df.index[required & invalid] + first_row:
+        print(f"Warning: Skipping row {row_num} in {csv_path}: invalid numeric value", file=sys.stderr)
+    keep = required & ~invalid
+
+    def optional(values):
+        values = values[keep]
+        if values.hasnans:
+            return values.astype(object).where(values.notna(), None).tolist()
+        return values.tolist()
+
+    # int(float(x)) semantics: truncate towards zero
+    altitude = np.trunc(numeric["altitude_ft"][keep])
+    altitude = altitude.fillna(0).astype("int64").astype(object).where(altitude.notna(), None)
+
+    columns = (
+        df["timestamp_utc"][keep].tolist(),
+        df["icao"][keep].str.strip().tolist(),
+        df["flight"][keep].str.strip().tolist(),
+        numeric["lat"][keep].tolist(),
+        numeric["lon"][keep].tolist(),
+        altitude.tolist(),
+        optional(numeric["speed_kts"]),
+        optional(numeric["heading_deg"]),
+        df["squawk"][keep].str.strip().tolist(),
+    )
+    return [dict(zip(CSV_COLUMNS, row)) for row in zip(*columns)]
+
+
+def _iter_csv_positions_stdlib(csv_path) -> Iterator[Dict[str, Any]]:
+    """Row-by-row CSV reader used when pandas is not installed."""
     with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row_num, row in enumerate(reader, start=2):
-            try:
-                if not row.get("icao") or not row.get("lat") or not row.get("lon"):
-                    continue
-
-                lat = float(row["lat"])
-                lon = float(row["lon"])
-
-                position = {
-                    "timestamp_utc": row.get("timestamp_utc", ""),
-                    "icao": row.get("icao", "").strip(),
-                    "flight": row.get("flight", "").strip(),
-                    "lat": lat,
-                    "lon": lon,
-                    "altitude_ft": int(float(row["altitude_ft"])) if row.get("altitude_ft") and row["altitude_ft"].strip() else None,
-                    "speed_kts": float(row["speed_kts"]) if row.get("speed_kts") and row["speed_kts"].strip() else None,
-                    "heading_deg": float(row["heading_deg"]) if row.get("heading_deg") and row["heading_deg"].strip() else None,
-                    "squawk": row.get("squawk", "").strip(),
-                }
-                positions.append(position)
-            except (ValueError, KeyError) as e:
-                print(f"Warning: Skipping row {row_num} in {csv_path}: {e}", file=sys.stderr)
+        yield from _iter_csv_rows_stdlib(f, csv_path)
+
+
+def _iter_csv_rows_stdlib(f, label) -> Iterator[Dict[str, Any]]:
+    """Parse positions from an open CSV text stream with the csv module."""
+    reader = csv.DictReader(f)
+    for row_num, row in enumerate(reader, start=2):
+        try:
+            if not row.get("icao") or not row.get("lat") or not row.get("lon"):
                 continue
 
-    return positions
+            lat = float(row["lat"])
+            lon = float(row["lon"])
+
+            position = {
+                "timestamp_utc": row.get("timestamp_utc", ""),
+                "icao": row.get("icao", "").strip(),
+                "flight": row.get("flight", "").strip(),
+                "lat": lat,
+                "lon": lon,
+                "altitude_ft": int(float(row["altitude_ft"])) if row.get("altitude_ft") and row["altitude_ft"].strip() else None,
+                "speed_kts": float(row["speed_kts"]) if row.get("speed_kts") and row["speed_kts"].strip() else None,
+                "heading_deg": float(row["heading_deg"]) if row.get("heading_deg") and row["heading_deg"].strip() else None,
+                "squawk": row.get("squawk", "").strip(),
+            }
+        except (ValueError, KeyError) as e:
+            print(f"Warning: Skipping row {row_num} in {label}: {e}", file=sys.stderr)
+            continue
+        yield position
 
 
 def calculate_headings_from_trajectory(positions: List[Dict[str, Any]], history_path=None) -> None:
@@ -89,12 +291,9 @@ def calculate_headings_from_trajectory(positions: List[Dict[str, Any]], history_
     Modifies positions in place.
     """
     # Group positions by ICAO
-    icao_positions = {}
+    icao_positions = defaultdict(list)
     for p in positions:
-        icao = p["icao"]
-        if icao not in icao_positions:
-            icao_positions[icao] = []
-        icao_positions[icao].append(p)
+        icao_positions[p["icao"]].append(p)
 
     # For aircraft with only one position, try to load recent historical positions
     if history_path and os.path.exists(history_path):
@@ -175,6 +374,191 @@ def load_svg_icons() -> Dict[str, str]:
     return svg_icons
 
 
+def group_trajectories(positions: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Group positions by ICAO, each list sorted oldest to newest.
+
+    A single sort by (icao, time) makes every trajectory a contiguous run,
+    so the last element of each list is that aircraft's latest position.
+    """
+    ordered = sorted(positions, key=itemgetter("icao", "timestamp_utc"))
+    return {icao: list(group) for icao, group in groupby(ordered, key=itemgetter("icao"))}
+
+
+def color_runs(coords: List[Any], colors: List[str]) -> Dict[str, List[List[Any]]]:
+    """
+    Join consecutive segments of the same color into runs.
+
+    Segment i goes from coords[i] to coords[i + 1] in colors[i]. Returns the
+    runs of each color as coordinate lists, in trajectory order, so a whole
+    trajectory is drawn by one multi-polyline per color.
+    """
+    runs: Dict[str, List[List[Any]]] = {}
+    start = 0
+    for i in range(1, len(colors) + 1):
+        if i == len(colors) or colors[i] != colors[start]:
+            runs.setdefault(colors[start], []).append(coords[start:i + 1])
+            start = i
+    return runs
+
+
+# (max zoom, Douglas-Peucker tolerance in degrees) of the coarser trajectory
+# levels; closer zooms draw every point
+LINE_LOD_LEVELS = ((6, 0.05), (10, 0.005))
+
+
+def line_lod_indices(runs: List[List[Any]]) -> Optional[List[Optional[List[Optional[List[int]]]]]]:
+    """
+    Kept point indices of each run at every LINE_LOD_LEVELS level.
+
+    A run that keeps all its points is None, as is a level where every run
+    does; returns None when no level drops any point.
+    """
+    levels = []
+    for _, tolerance in LINE_LOD_LEVELS:
+        level = []
+        for run in runs:
+            kept = simplify_path_indices(run, tolerance)
+            level.append(kept if len(kept) < len(run) else None)
+        levels.append(level if any(kept is not None for kept in level) else None)
+    return levels if any(level is not None for level in levels) else None
+
+
+@lru_cache(maxsize=65536)
+def _parse_timestamp(timestamp_utc: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 timestamp, None if it is missing or malformed.
+
+    Timestamps without an offset are taken as UTC, the zone the CSV files use.
+    """
+    try:
+        dt = datetime.fromisoformat(timestamp_utc.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=65536)
+def _timestamp_ms(timestamp_utc: Optional[str]) -> int:
+    """Milliseconds since the epoch of an ISO 8601 timestamp, 0 if it does not parse."""
+    dt = _parse_timestamp(timestamp_utc)
+    return round(dt.timestamp() * 1000) if dt is not None else 0
+
+
+def _position_record(p: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a position onto the fields used by the map JavaScript."""
+    # 5 decimals is about 1 m, well below ADS-B position accuracy, and keeps
+    # each coordinate to a few bytes of JSON instead of a full float repr
+    return {
+        "icao": p["icao"],
+        "flight": p.get("flight", ""),
+        "lat": round(p["lat"], 5),
+        "lon": round(p["lon"], 5),
+        "altitude_ft": p.get("altitude_ft"),
+        "speed_kts": p.get("speed_kts"),
+        "heading_deg": p.get("heading_deg"),
+        "squawk": p.get("squawk", ""),
+        "time_ms": _timestamp_ms(p.get("timestamp_utc")),
+    }
+
+
+# The map data file holds little-endian columns the page maps straight onto
+# typed arrays: a header of two uint32 (position count, string table size),
+# float64 time_ms, int32 lat and lon in millionths of a degree (about 0.1 m),
+# one uint32 column of string table indices per _STRING_FIELDS entry, one
+# uint16 fixed-point column per _SCALED_FIELDS entry, then the string table as
+# a UTF-8 JSON array. Columns are ordered so each typed array is aligned.
+_COORD_SCALE = 1_000_000
+_STRING_FIELDS = ("icao", "flight", "squawk")
+# (field, scale, offset): stored as round((value + offset) * scale), so
+# altitude covers -1000..64534 ft in 1 ft steps, speed 0.1 kt, heading 0.01 deg
+_SCALED_FIELDS = (("altitude_ft", 1, 1000), ("speed_kts", 10, 0), ("heading_deg", 100, 0))
+_SCALED_MISSING = 0xFFFF
+
+
+def pack_positions_binary(positions: Iterable[Dict[str, Any]]) -> bytes:
+    """Pack positions as columns in the map data file layout."""
+    times = array("d")
+    lats = array("i")
+    lons = array("i")
+    indices = {field: array("I") for field in _STRING_FIELDS}
+    scaled = {field: array("H") for field, _, _ in _SCALED_FIELDS}
+    strings: Dict[str, int] = {}
+    for p in positions:
+        times.append(_timestamp_ms(p.get("timestamp_utc")))
+        lats.append(round(p["lat"] * _COORD_SCALE))
+        lons.append(round(p["lon"] * _COORD_SCALE))
+        for field, column in indices.items():
+            value = p.get(field) or ""
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+            column.append(index)
+        for field, scale, offset in _SCALED_FIELDS:
+            value = p.get(field)
+            if value is None or value != value:  # None or NaN
+                scaled[field].append(_SCALED_MISSING)
+            else:
+                scaled[field].append(min(max(round((value + offset) * scale), 0), _SCALED_MISSING - 1))
+
+    string_table = dumps_bytes(list(strings))
+    columns = [times, lats, lons, *indices.values(), *scaled.values()]
+    if sys.byteorder == "big":
+        for column in columns:
+            column.byteswap()
+    return b"".join([struct.pack("<II", len(times), len(string_table)),
+                     *(column.tobytes() for column in columns), string_table])
+
+
+def write_positions_binary(positions: Iterable[Dict[str, Any]], data_path: str) -> None:
+    """Write positions as packed columns in the map data file layout."""
+    data = pack_positions_binary(positions)
+    with open(data_path, "wb") as f:
+        f.write(data)
+
+
+def map_data_path(output_path: str) -> str:
+    """Path of the binary data file that belongs to a map HTML file."""
+    return os.path.splitext(output_path)[0] + "_data.bin"
+
+
+def update_map_data(positions: List[Dict[str, Any]], output_path: str) -> None:
+    """
+    Rewrite only the data file of a map previously written by create_map.
+
+    A page served over HTTP re-fetches this file every second and redraws
+    markers and trajectory lines from it, so the HTML does not need to be
+    rendered again while the set of current aircraft stays the same.
+    """
+    calculate_headings_from_trajectory(positions, str(get_history_csv_path()))
+    write_positions_binary(positions, map_data_path(output_path))
+    # The HTML on disk no longer matches a fresh create_map for these inputs
+    _last_map_digests.pop(output_path, None)
+
+
+# Digest of the inputs behind the last map written to each output path
+_last_map_digests: Dict[str, bytes] = {}
+
+
+def _map_digest(data: bytes, current_icaos: set, *settings: Any) -> bytes:
+    """
+    Hash everything a create_map call writes, without building the output.
+
+    data is the packed data file, which carries every position field the page
+    shows at the precision it is written with.
+    """
+    digest = hashlib.blake2b(dumps_bytes([sorted(current_icaos), *settings]), digest_size=8)
+    digest.update(data)
+    return digest.digest()
+
+
+HOME_ICON_HTML = (
+    '<div style="background-color: red; border: 2px solid white; border-radius: 50%; '
+    'width: 30px; height: 30px; display: flex; align-items: center; justify-content: center; '
+    'font-weight: bold; font-size: 18px; color: white; box-shadow: 0 2px 4px rgba(0,0,0,0.3);">H</div>'
+)
+
+
 def create_map(positions: List[Dict[str, Any]], output_path: str = None,
                title: str = "ADS-B Aircraft Positions", refresh_interval: int = 1,
                current_icaos: Optional[set] = None) -> None:
@@ -204,34 +588,72 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
     print(f"Home location: {home_display_name}")
     print(f"Coordinates: {home_lat}, {home_lon} | Elevation: {home_elevation_m:.0f}m ({home_elevation_ft:.0f}ft)")
 
-    # Calculate bounds to fit all current aircraft
-    latest_positions = {}
-    for p in positions:
-        if current_icaos is None or p["icao"] in current_icaos:
-            icao = p["icao"]
-            if icao not in latest_positions or p.get("timestamp_utc", "") > latest_positions[icao].get("timestamp_utc", ""):
-                latest_positions[icao] = p
-
-    current_positions_list = list(latest_positions.values())
-    all_lats = [home_lat] + [p["lat"] for p in current_positions_list]
-    all_lons = [home_lon] + [p["lon"] for p in current_positions_list]
+    trajectories = group_trajectories(positions)
+
+    # Calculate bounds to fit home and the latest position of every current
+    # aircraft in a single pass, without building coordinate lists
+    min_lat = max_lat = home_lat
+    min_lon = max_lon = home_lon
+    current_count = 0
+    for icao, pos_list in trajectories.items():
+        if current_icaos is not None and icao not in current_icaos:
+            continue
+        latest = pos_list[-1]
+        lat, lon = latest["lat"], latest["lon"]
+        if lat < min_lat:
+            min_lat = lat
+        elif lat > max_lat:
+            max_lat = lat
+        if lon < min_lon:
+            min_lon = lon
+        elif lon > max_lon:
+            max_lon = lon
+        current_count += 1
 
     bounds = None
-    if len(current_positions_list) > 0:
-        min_lat, max_lat = min(all_lats), max(all_lats)
-        min_lon, max_lon = min(all_lons), max(all_lons)
+    if current_count > 0:
         lat_padding = (max_lat - min_lat) * 0.05 or 0.01
         lon_padding = (max_lon - min_lon) * 0.05 or 0.01
         bounds = [
             [min_lat - lat_padding, min_lon - lon_padding],
             [max_lat + lat_padding, max_lon + lon_padding]
         ]
-        print(f"Fitting map to {len(current_positions_list)} current aircraft")
+        print(f"Fitting map to {current_count} current aircraft")
     else:
         print("No current aircraft, centering on home")
 
+    # Determine current ICAOs if not provided. Trajectories are time-ordered,
+    # so only each aircraft's latest timestamp needs parsing.
+    if current_icaos is None:
+        current_icaos = set()
+        current_time = datetime.now(timezone.utc)
+        for icao, pos_list in trajectories.items():
+            pos_time = _parse_timestamp(pos_list[-1].get("timestamp_utc"))
+            if pos_time is not None and (current_time - pos_time).total_seconds() < 120:
+                current_icaos.add(icao)
+
+    # Calculate headings from trajectory
+    history_path = get_history_csv_path()
+    calculate_headings_from_trajectory(positions, str(history_path))
+
+    # Nothing that feeds the page changed since the last write to this path,
+    # so keep the existing HTML and data file instead of regenerating them
+    data_path = map_data_path(output_path)
+    data = pack_positions_binary(positions)
+    digest = _map_digest(
+        data, current_icaos,
+        title, refresh_interval,
+        home_lat, home_lon, home_elevation_m, home_elevation_ft, home_display_name,
+    )
+    if (_last_map_digests.get(output_path) == digest
+            and os.path.exists(output_path) and os.path.exists(data_path)):
+        print(f"Map unchanged, keeping: {output_path}")
+        return
+
     # Create map
-    m = folium.Map(location=[home_lat, home_lon], zoom_start=10, tiles="OpenStreetMap")
+    # Canvas rendering draws all trajectory segments into one element instead
+    # of creating an SVG path node per segment
+    m = folium.Map(location=[home_lat, home_lon], zoom_start=10, tiles="OpenStreetMap", prefer_canvas=True)
 
     if bounds:
         m.fit_bounds(bounds)
@@ -241,24 +663,8 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
     folium.TileLayer("CartoDB dark_matter").add_to(m)
 
     # Add home marker
-    home_icon_html = '''
-    <div style="
-        background-color: red;
-        border: 2px solid white;
-        border-radius: 50%;
-        width: 30px;
-        height: 30px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-weight: bold;
-        font-size: 18px;
-        color: white;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.3);
-    ">H</div>
-    '''
     home_icon = DivIcon(
-        html=home_icon_html,
+        html=HOME_ICON_HTML,
         icon_size=(30, 30),
         icon_anchor=(15, 15),
         class_name='home-marker'
@@ -271,50 +677,60 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         icon=home_icon,
     ).add_to(m)
 
-    # Determine current ICAOs if not provided
-    if current_icaos is None:
-        current_icaos = set()
-        try:
-            current_time = datetime.now(timezone.utc)
-            for pos in positions:
-                if pos.get("timestamp_utc"):
-                    try:
-                        pos_time = datetime.fromisoformat(pos["timestamp_utc"].replace('Z', '+00:00'))
-                        if (current_time - pos_time).total_seconds() < 120:
-                            current_icaos.add(pos["icao"])
-                    except:
-                        pass
-        except:
-            current_icaos = set(p["icao"] for p in positions)
-
-    # Draw trajectory lines for all aircraft
-    icao_groups = {}
-    for pos in positions:
-        icao = pos["icao"]
-        if icao not in icao_groups:
-            icao_groups[icao] = []
-        icao_groups[icao].append(pos)
-
-    for icao, pos_list in icao_groups.items():
-        pos_list_sorted = sorted(pos_list, key=lambda p: p.get("timestamp_utc", ""))
-        latest = pos_list_sorted[-1] if pos_list_sorted else pos_list[0]
-        marker_color = get_altitude_color(latest.get("altitude_ft"))
+    # Draw trajectory lines for all aircraft into one layer that is attached
+    # to the map once, instead of adding every segment to the map directly.
+    # Lines are bucketed by the 0.1 degree tile holding the south-west corner
+    # of their bounding box, so the page can detach tiles that are off screen.
+    trajectory_group = folium.FeatureGroup(name="Trajectories", show=True)
+    line_tiles = {}
+    static_line_lods = {}
+    for icao, pos_list_sorted in trajectories.items():
         is_current = icao in current_icaos if current_icaos else True
 
         if len(pos_list_sorted) > 1:
             line_opacity = 0.6 if is_current else 0.3
-            # Draw each segment with color based on altitude (rainbow effect)
-            for i in range(len(pos_list_sorted) - 1):
-                p1 = pos_list_sorted[i]
-                p2 = pos_list_sorted[i + 1]
-                # Use the altitude at the start of each segment for coloring
-                segment_color = get_altitude_color(p1.get("altitude_ft"))
-                folium.PolyLine(
-                    [[p1["lat"], p1["lon"]], [p2["lat"], p2["lon"]]],
+            # Draw each segment with color based on altitude (rainbow effect),
+            # using the altitude at the start of each segment
+            segment_colors = get_altitude_colors(p.get("altitude_ft") for p in pos_list_sorted[:-1])
+            # Build each (lat, lon) pair once; consecutive segments share endpoints
+            trajectory_coords = [None] * len(pos_list_sorted)
+            for i, p in enumerate(pos_list_sorted):
+                trajectory_coords[i] = (p["lat"], p["lon"])
+
+            lats = [c[0] for c in trajectory_coords]
+            lons = [c[1] for c in trajectory_coords]
+            line_bounds = [min(lats), min(lons), max(lats), max(lons)]
+            tile_key = (math.floor(line_bounds[0] * 10), math.floor(line_bounds[1] * 10))
+            tile = line_tiles.get(tile_key)
+            if tile is None:
+                tile_group = folium.FeatureGroup(name=f"tile_{tile_key[0]}_{tile_key[1]}", control=False)
+                tile = line_tiles[tile_key] = (tile_group, line_bounds)
+            else:
+                tile_bounds = tile[1]
+                tile_bounds[0] = min(tile_bounds[0], line_bounds[0])
+                tile_bounds[1] = min(tile_bounds[1], line_bounds[1])
+                tile_bounds[2] = max(tile_bounds[2], line_bounds[2])
+                tile_bounds[3] = max(tile_bounds[3], line_bounds[3])
+
+            # One (multi-)polyline per color instead of one per segment
+            for segment_color, runs in color_runs(trajectory_coords, segment_colors).items():
+                line = folium.PolyLine(
+                    runs[0] if len(runs) == 1 else runs,
                     color=segment_color,
                     weight=3,
                     opacity=line_opacity,
-                ).add_to(m)
+                )
+                line.add_to(tile[0])
+                lods = line_lod_indices(runs)
+                if lods:
+                    static_line_lods[line.get_name()] = lods
+    for tile_group, _ in line_tiles.values():
+        tile_group.add_to(trajectory_group)
+    trajectory_group.add_to(m)
+    static_line_tiles_json = json_dumps([[group.get_name(), *bounds] for group, bounds in line_tiles.values()])
+    static_line_lods_json = json_dumps(static_line_lods)
+    line_lod_levels_json = json_dumps(LINE_LOD_LEVELS)
+    scaled_fields_json = json_dumps(_SCALED_FIELDS)
 
     # Add layer control
     folium.LayerControl().add_to(m)
@@ -324,8 +740,7 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
     if AIRCRAFT_DB_AVAILABLE:
         db = AircraftDatabase()
         if db.load():
-            unique_icaos = set(p["icao"] for p in positions)
-            for icao in unique_icaos:
+            for icao in trajectories:
                 info = db.lookup(icao)
                 if info and info.get("type"):
                     aircraft_types[icao] = {
@@ -336,35 +751,22 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
                         "icon": get_icon_for_type(info.get("type", ""))
                     }
 
-    # Calculate headings from trajectory
-    history_path = get_history_csv_path()
-    calculate_headings_from_trajectory(positions, str(history_path))
-
-    # Prepare data for JavaScript
-    positions_data = [
-        {
-            "icao": p["icao"],
-            "flight": p.get("flight", ""),
-            "lat": p["lat"],
-            "lon": p["lon"],
-            "altitude_ft": p.get("altitude_ft"),
-            "speed_kts": p.get("speed_kts"),
-            "heading_deg": p.get("heading_deg"),
-            "squawk": p.get("squawk", ""),
-            "timestamp_utc": p.get("timestamp_utc", "")
-        }
-        for p in positions
-    ]
-    positions_json = json.dumps(positions_data)
-    aircraft_types_json = json.dumps(aircraft_types)
-    svg_icons_json = json.dumps(load_svg_icons())
-    current_icaos_json = json.dumps(list(current_icaos) if current_icaos else [])
-
-    # Save JSON data file
-    json_path = os.path.splitext(output_path)[0] + "_data.json"
-    json_filename = os.path.basename(json_path)
-    with open(json_path, "w", encoding="utf-8") as f:
-        f.write(positions_json)
+    # Save the data file, fetched by the page when served over HTTP; it was
+    # already packed for the digest
+    data_filename = os.path.basename(data_path)
+    with open(data_path, "wb") as f:
+        f.write(data)
+
+    # Only current aircraft are embedded for file:// viewing; every trajectory
+    # is already drawn by the static polylines above.
+    embedded_positions = [p for p in positions if p["icao"] in current_icaos] if current_icaos else []
+    positions_data = [None] * len(embedded_positions)
+    for i, p in enumerate(embedded_positions):
+        positions_data[i] = _position_record(p)
+    positions_json = json_dumps(positions_data)
+    aircraft_types_json = json_dumps(aircraft_types)
+    svg_icons_json = json_dumps(load_svg_icons())
+    current_icaos_json = json_dumps(list(current_icaos) if current_icaos else [])
 
     # Add CSS
     icon_css = '''
@@ -424,7 +826,7 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
                font-size:14px;
                font-weight:normal">
     {title}<br>
-    <span id="map-stats" style="font-size:12px;color:#fff;">Aircraft: {len(set(p["icao"] for p in positions))} | Positions: {len(positions)}</span><br>
+    <span id="map-stats" style="font-size:12px;color:#fff;">Aircraft: {len(trajectories)} | Positions: {len(positions)}</span><br>
     <span style="font-size:10px;color:rgba(255,255,255,0.6);">Auto-updating every 1s</span>
     </h3>
     '''
@@ -433,6 +835,7 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
     # Add JavaScript for dynamic updates
     home_display_name_escaped = home_display_name.replace("'", "\\'")
     altitude_color_js = get_altitude_color_js()
+    home_icon_html_json = json_dumps(HOME_ICON_HTML)
 
     update_js = f'''
     <script>
@@ -440,6 +843,13 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
     let currentICAOs = new Set({current_icaos_json});
     let aircraftTypes = {aircraft_types_json};
     const SVG_ICONS = {svg_icons_json};
+    // [layer variable, south, west, north, east] for each tile of static lines
+    const STATIC_LINE_TILES = {static_line_tiles_json};
+    const STATIC_LINE_PARENT = '{trajectory_group.get_name()}';
+    const STATIC_LINE_LODS = {static_line_lods_json};
+    const SCALED_FIELDS = {scaled_fields_json};
+    // (max zoom, Douglas-Peucker tolerance in degrees) of the coarser line levels
+    const LINE_LOD_LEVELS = {line_lod_levels_json};
 
     const HOME_LOCATION = {{
         lat: {home_lat},
@@ -449,6 +859,16 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         name: '{home_display_name_escaped}'
     }};
 
+    // Built once; the home marker is recreated from this icon if it is lost
+    const HOME_LAT = HOME_LOCATION.lat;
+    const HOME_LON = HOME_LOCATION.lon;
+    const HOME_ICON = L.divIcon({{
+        className: 'home-marker',
+        html: {home_icon_html_json},
+        iconSize: [30, 30],
+        iconAnchor: [15, 15]
+    }});
+
     function calculate3DDistance(aircraft_lat, aircraft_lon, aircraft_alt_ft) {{
         const R = 6371.0;
         const lat1 = HOME_LOCATION.lat * Math.PI / 180;
@@ -479,7 +899,20 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
     let lineLayer = null;
     let currentMarkers = {{}};
     let currentLines = {{}};
+    let lineTiles = {{}};
+    let staticLineTiles = [];
+    let staticLines = [];
+    let lineLodLevel = null;
     let homeMarker = null;
+    // One shared canvas for the live trajectory lines
+    const LINE_RENDERER = L.canvas({{ padding: 0.5 }});
+    // Past this many aircraft, markers switch from rotated SVG icons (a DOM
+    // node each) to circles drawn on one canvas above the lines
+    const CANVAS_MARKER_THRESHOLD = 500;
+    const MARKER_RENDERER = L.canvas({{ padding: 0.5, pane: 'markerPane' }});
+    let canvasMarkers = false;
+    const svgIconCache = new Map();
+    const SVG_ICON_CACHE_SIZE = 5000;
 
     (function initializeMap() {{
         function findMap() {{
@@ -507,20 +940,27 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
                 mapObj.addLayer(markerLayer);
                 mapObj.addLayer(lineLayer);
 
-                const homeLat = {home_lat};
-                const homeLon = {home_lon};
-                if (homeLat && homeLon) {{
-                    const homeIcon = L.divIcon({{
-                        className: 'home-marker',
-                        html: '<div style="background-color: red; border: 2px solid white; border-radius: 50%; width: 30px; height: 30px; display: flex; align-items: center; justify-content: center; font-weight: bold; font-size: 18px; color: white; box-shadow: 0 2px 4px rgba(0,0,0,0.3);">H</div>',
-                        iconSize: [30, 30],
-                        iconAnchor: [15, 15]
-                    }});
-                    homeMarker = L.marker([homeLat, homeLon], {{ icon: homeIcon }}).bindPopup('<b>Home Position</b>');
-                    mapObj.addLayer(homeMarker);
+                ensureHomeMarker(mapObj);
+
+                const staticParent = window[STATIC_LINE_PARENT];
+                if (staticParent) {{
+                    staticLineTiles = STATIC_LINE_TILES
+                        .filter(t => window[t[0]])
+                        .map(t => ({{ parent: staticParent, group: window[t[0]], bounds: L.latLngBounds([t[1], t[2]], [t[3], t[4]]) }}));
                 }}
+                staticLines = Object.keys(STATIC_LINE_LODS).filter(name => window[name]).map(name => {{
+                    const line = window[name];
+                    const latlngs = line.getLatLngs();
+                    line.lod = {{ runs: L.LineUtil.isFlat(latlngs) ? [latlngs] : latlngs, levels: STATIC_LINE_LODS[name] }};
+                    return line;
+                }});
+                refreshLineLod();
 
                 updateMarkers(embeddedPositionsData);
+                // Only line tiles near the viewport stay attached; pan/zoom just toggles them
+                mapObj.on('moveend', refreshVisibleTiles);
+                // Lines are redrawn from fewer points when zoomed out
+                mapObj.on('zoomend', refreshLineLod);
                 startAutoUpdate();
             }} else {{
                 setTimeout(findMap, 100);
@@ -530,20 +970,24 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         else window.addEventListener('load', findMap);
     }})();
 
-    function formatTimeAgo(timestamp_utc) {{
-        if (!timestamp_utc) return '';
-        try {{
-            const posTime = new Date(timestamp_utc);
-            const now = new Date();
-            const diffSec = Math.floor((now - posTime) / 1000);
-            if (diffSec < 5) return 'now';
-            if (diffSec < 60) return `${{diffSec}} seconds ago`;
-            const diffMin = Math.floor(diffSec / 60);
-            if (diffMin === 1) return '1 minute ago';
-            if (diffMin < 60) return `${{diffMin}} minutes ago`;
-            const diffHr = Math.floor(diffMin / 60);
-            return diffHr === 1 ? '1 hour ago' : `${{diffHr}} hours ago`;
-        }} catch(e) {{ return timestamp_utc; }}
+    function ensureHomeMarker(mapObj) {{
+        if (!HOME_LAT || !HOME_LON) return;
+        if (!homeMarker) {{
+            homeMarker = L.marker([HOME_LAT, HOME_LON], {{ icon: HOME_ICON }}).bindPopup('<b>Home Position</b>');
+        }}
+        if (!mapObj.hasLayer(homeMarker)) mapObj.addLayer(homeMarker);
+    }}
+
+    function formatTimeAgo(time_ms) {{
+        if (!time_ms) return '';
+        const diffSec = Math.floor((Date.now() - time_ms) / 1000);
+        if (diffSec < 5) return 'now';
+        if (diffSec < 60) return `${{diffSec}} seconds ago`;
+        const diffMin = Math.floor(diffSec / 60);
+        if (diffMin === 1) return '1 minute ago';
+        if (diffMin < 60) return `${{diffMin}} minutes ago`;
+        const diffHr = Math.floor(diffMin / 60);
+        return diffHr === 1 ? '1 hour ago' : `${{diffHr}} hours ago`;
     }}
 
     function getAircraftIconType(icao) {{
@@ -554,13 +998,158 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
         return aircraftTypes[icao] || null;
     }}
 
+    function buildPopup(latest) {{
+        // Three sections joined once; missing fields drop out via filter(Boolean)
+        const acInfo = getAircraftInfo(latest.icao);
+        return [
+            '<div style="font-family: -apple-system, BlinkMacSystemFont, sans-serif; font-size: 13px;">',
+
+            // Section 1: Aircraft Data (static info)
+            '<table style="width: 100%; border-collapse: collapse; margin-bottom: 8px; table-layout: fixed;">',
+            `<tr><td style="width: 50%; padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">ICAO</td><td style="width: 50%; padding: 2px 0; font-weight: 600; color: #fff;">${{latest.icao}}</td></tr>`,
+            latest.flight && `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Flight</td><td style="padding: 2px 0; font-weight: 600; color: #fff;">${{latest.flight}}</td></tr>`,
+            acInfo && acInfo.registration && `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Registration</td><td style="padding: 2px 0; color: #fff;">${{acInfo.registration}}</td></tr>`,
+            acInfo && acInfo.type && `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Type</td><td style="padding: 2px 0; color: #fff;">${{acInfo.type}}</td></tr>`,
+            acInfo && acInfo.model && `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Model</td><td style="padding: 2px 0; color: #fff;">${{acInfo.model}}</td></tr>`,
+            '</table>',
+
+            // Divider
+            '<hr style="border: none; border-top: 1px solid rgba(255,255,255,0.2); margin: 6px 0;">',
+
+            // Section 2: Live Data (dynamic info)
+            '<table style="width: 100%; border-collapse: collapse; margin-bottom: 8px; table-layout: fixed;">',
+            latest.time_ms && `<tr><td style="width: 50%; padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Spotted</td><td style="width: 50%; padding: 2px 0; color: #fff;">${{formatTimeAgo(latest.time_ms)}}</td></tr>`,
+            `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Distance</td><td style="padding: 2px 0; color: #fff;">${{formatDistance(calculate3DDistance(latest.lat, latest.lon, latest.altitude_ft))}}</td></tr>`,
+            latest.altitude_ft && `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Altitude</td><td style="padding: 2px 0; color: #fff;">${{latest.altitude_ft.toLocaleString()}} ft <span style="color:rgba(255,255,255,0.5);">(${{Math.round(latest.altitude_ft * 0.3048).toLocaleString()}} m)</span></td></tr>`,
+            latest.speed_kts && `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Speed</td><td style="padding: 2px 0; color: #fff;">${{Math.round(latest.speed_kts)}} kts <span style="color:rgba(255,255,255,0.5);">(${{Math.round(latest.speed_kts * 1.852)}} km/h)</span></td></tr>`,
+            latest.heading_deg != null && `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Heading</td><td style="padding: 2px 0; color: #fff;">${{Math.round(latest.heading_deg)}}°</td></tr>`,
+            latest.squawk && `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Squawk</td><td style="padding: 2px 0; color: #fff;">${{latest.squawk}}</td></tr>`,
+            '</table>',
+
+            // Section 3: Tracking Links
+            '<hr style="border: none; border-top: 1px solid rgba(255,255,255,0.2); margin: 6px 0;">',
+            '<div style="text-align: center; padding-top: 2px;">',
+            `<a href="https://globe.adsbexchange.com/?icao=${{latest.icao.toLowerCase()}}" target="_blank" style="color:#6cb8ff; text-decoration:none; margin-right: 12px;">ADSBexchange</a>`,
+            acInfo && acInfo.registration && `<a href="https://www.flightradar24.com/data/aircraft/${{acInfo.registration.toLowerCase()}}" target="_blank" style="color:#6cb8ff; text-decoration:none;">FlightRadar24</a>`,
+            '</div>',
+            '</div>',
+        ].filter(Boolean).join('');
+    }}
+
     function createSvgIcon(icao, altitude_ft, heading_deg) {{
+        // Icons are shared by (type, color, whole-degree heading), so an
+        // aircraft whose icon looks the same keeps the same object
         const iconType = getAircraftIconType(icao);
         const color = getAltitudeColor(altitude_ft);
-        const rotation = heading_deg !== null && heading_deg !== undefined ? heading_deg : 0;
-        let svg = (SVG_ICONS[iconType] || SVG_ICONS['plane']).replace(/\\{{COLOR\\}}/g, color);
-        const html = `<div style="transform: rotate(${{rotation}}deg); transform-origin: center center;">${{svg}}</div>`;
-        return L.divIcon({{ html: html, className: 'aircraft-icon', iconSize: [28, 28], iconAnchor: [14, 14], popupAnchor: [0, -14] }});
+        const rotation = heading_deg !== null && heading_deg !== undefined ? Math.round(heading_deg) % 360 : 0;
+        const key = iconType + '|' + color + '|' + rotation;
+        let icon = svgIconCache.get(key);
+        if (!icon) {{
+            if (svgIconCache.size >= SVG_ICON_CACHE_SIZE) svgIconCache.clear();
+            let svg = (SVG_ICONS[iconType] || SVG_ICONS['plane']).replace(/\\{{COLOR\\}}/g, color);
+            const html = `<div style="transform: rotate(${{rotation}}deg); transform-origin: center center;">${{svg}}</div>`;
+            icon = L.divIcon({{ html: html, className: 'aircraft-icon', iconSize: [28, 28], iconAnchor: [14, 14], popupAnchor: [0, -14] }});
+            svgIconCache.set(key, icon);
+        }}
+        return icon;
+    }}
+
+    function trajectoryBounds(posList) {{
+        let minLat = Infinity, maxLat = -Infinity, minLon = Infinity, maxLon = -Infinity;
+        for (const p of posList) {{
+            if (p.lat < minLat) minLat = p.lat;
+            if (p.lat > maxLat) maxLat = p.lat;
+            if (p.lon < minLon) minLon = p.lon;
+            if (p.lon > maxLon) maxLon = p.lon;
+        }}
+        return [minLat, minLon, maxLat, maxLon];
+    }}
+
+    function getLineTile(bounds) {{
+        const key = Math.floor(bounds[0] * 10) + '_' + Math.floor(bounds[1] * 10);
+        let tile = lineTiles[key];
+        if (!tile) {{
+            // Boxes only grow while the tile holds any trajectory
+            tile = lineTiles[key] = {{ parent: lineLayer, group: L.featureGroup(), box: bounds.slice(), count: 0 }};
+        }} else {{
+            tile.box[0] = Math.min(tile.box[0], bounds[0]);
+            tile.box[1] = Math.min(tile.box[1], bounds[1]);
+            tile.box[2] = Math.max(tile.box[2], bounds[2]);
+            tile.box[3] = Math.max(tile.box[3], bounds[3]);
+        }}
+        return tile;
+    }}
+
+    function setTileVisible(tile, viewBounds) {{
+        const visible = !viewBounds || viewBounds.intersects(tile.bounds);
+        if (visible !== tile.parent.hasLayer(tile.group)) {{
+            if (visible) tile.parent.addLayer(tile.group);
+            else tile.parent.removeLayer(tile.group);
+        }}
+    }}
+
+    function refreshVisibleTiles() {{
+        const mapObj = lineLayer && lineLayer._map;
+        // Tiles touching the (padded) viewport are attached, the rest are detached
+        const viewBounds = mapObj ? mapObj.getBounds().pad(0.25) : null;
+        staticLineTiles.forEach(tile => setTileVisible(tile, viewBounds));
+        Object.values(lineTiles).forEach(tile => setTileVisible(tile, viewBounds));
+    }}
+
+    function getLineLodLevel(zoom) {{
+        const level = LINE_LOD_LEVELS.findIndex(l => zoom <= l[0]);
+        return level < 0 ? LINE_LOD_LEVELS.length : level;
+    }}
+
+    function simplifyIndices(points, tolerance) {{
+        // Douglas-Peucker on [lat, lon] points; kept indices, or null if all are kept
+        const n = points.length;
+        if (n < 3) return null;
+        const keep = new Uint8Array(n);
+        keep[0] = keep[n - 1] = 1;
+        const toleranceSq = tolerance * tolerance;
+        const stack = [[0, n - 1]];
+        let kept = 2;
+        while (stack.length) {{
+            const [first, last] = stack.pop();
+            const lat1 = points[first][0], lon1 = points[first][1];
+            const dLat = points[last][0] - lat1, dLon = points[last][1] - lon1;
+            const lengthSq = dLat * dLat + dLon * dLon;
+            let maxDistSq = toleranceSq, index = -1;
+            for (let i = first + 1; i < last; i++) {{
+                const lat = points[i][0], lon = points[i][1];
+                let t = lengthSq ? ((lat - lat1) * dLat + (lon - lon1) * dLon) / lengthSq : 0;
+                t = t < 0 ? 0 : t > 1 ? 1 : t;
+                const eLat = lat - lat1 - t * dLat, eLon = lon - lon1 - t * dLon;
+                const distSq = eLat * eLat + eLon * eLon;
+                if (distSq > maxDistSq) {{ maxDistSq = distSq; index = i; }}
+            }}
+            if (index >= 0) {{
+                keep[index] = 1;
+                kept++;
+                stack.push([first, index], [index, last]);
+            }}
+        }}
+        if (kept === n) return null;
+        const indices = [];
+        for (let i = 0; i < n; i++) if (keep[i]) indices.push(i);
+        return indices;
+    }}
+
+    function lineLatLngs(lod, level) {{
+        // lod.levels[level] holds kept indices per run; null keeps every point
+        const indices = level !== null && level < LINE_LOD_LEVELS.length ? lod.levels[level] : null;
+        return lod.runs.map((run, r) => indices && indices[r] ? indices[r].map(i => run[i]) : run);
+    }}
+
+    function refreshLineLod() {{
+        const mapObj = lineLayer && lineLayer._map;
+        if (!mapObj) return;
+        const level = getLineLodLevel(mapObj.getZoom());
+        if (level === lineLodLevel) return;
+        lineLodLevel = level;
+        staticLines.forEach(line => line.setLatLngs(lineLatLngs(line.lod, level)));
+        Object.values(currentLines).forEach(drawn => drawn.lines.forEach(line => line.setLatLngs(lineLatLngs(line.lod, level))));
     }}
 
     function startAutoUpdate() {{
@@ -574,22 +1163,61 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
     }}
 
     function updateMapData() {{
-        fetch('{json_filename}?t=' + new Date().getTime())
-            .then(r => r.json())
-            .then(data => {{
+        fetch('{data_filename}?t=' + new Date().getTime())
+            .then(r => {{
+                if (!r.ok) throw new Error(`HTTP ${{r.status}}`);
+                return r.arrayBuffer();
+            }})
+            .then(buffer => {{
+                const data = decodePositions(buffer);
                 embeddedPositionsData = data;
                 updateMarkers(data);
             }})
             .catch(e => console.log('Update failed:', e));
     }}
 
+    function decodePositions(buffer) {{
+        // Column layout written by write_positions_binary in plot_map.py
+        const header = new DataView(buffer, 0, 8);
+        const count = header.getUint32(0, true);
+        const stringTableSize = header.getUint32(4, true);
+        let offset = 8;
+        const times = new Float64Array(buffer, offset, count);
+        offset += count * 8;
+        const coords = new Int32Array(buffer, offset, count * 2);
+        offset += count * 8;
+        const indices = new Uint32Array(buffer, offset, count * 3);
+        offset += count * 12;
+        const scaled = new Uint16Array(buffer, offset, count * 3);
+        offset += count * 6;
+        const strings = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, offset, stringTableSize)));
+        const unscale = (column, i) => {{
+            const v = scaled[column * count + i];
+            return v === {_SCALED_MISSING} ? null : v / SCALED_FIELDS[column][1] - SCALED_FIELDS[column][2];
+        }};
+
+        const positions = new Array(count);
+        for (let i = 0; i < count; i++) {{
+            positions[i] = {{
+                icao: strings[indices[i]],
+                flight: strings[indices[count + i]],
+                lat: coords[i] / {_COORD_SCALE},
+                lon: coords[count + i] / {_COORD_SCALE},
+                altitude_ft: unscale(0, i),
+                speed_kts: unscale(1, i),
+                heading_deg: unscale(2, i),
+                squawk: strings[indices[2 * count + i]],
+                time_ms: times[i]
+            }};
+        }}
+        return positions;
+    }}
+
     function updateMarkers(positions) {{
         if (!markerLayer || !lineLayer) return;
 
         const mapObj = markerLayer._map;
-        if (mapObj && homeMarker && !mapObj.hasLayer(homeMarker)) {{
-            mapObj.addLayer(homeMarker);
-        }}
+        if (mapObj) ensureHomeMarker(mapObj);
 
         const icaoGroups = {{}};
         positions.forEach(pos => {{
@@ -602,6 +1230,13 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
             statsEl.textContent = `Aircraft: ${{Object.keys(icaoGroups).length}} | Positions: ${{positions.length}} | Current: ${{currentICAOs.size}}`;
         }}
 
+        const useCanvas = currentICAOs.size > CANVAS_MARKER_THRESHOLD;
+        if (useCanvas !== canvasMarkers) {{
+            markerLayer.clearLayers();
+            currentMarkers = {{}};
+            canvasMarkers = useCanvas;
+        }}
+
         Object.keys(currentMarkers).forEach(icao => {{
             if (!currentICAOs.has(icao)) {{
                 markerLayer.removeLayer(currentMarkers[icao]);
@@ -609,83 +1244,104 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
             }}
         }});
 
-        lineLayer.clearLayers();
-        currentLines = {{}};
+        const drawnLines = new Set();
 
         Object.keys(icaoGroups).forEach(icao => {{
-            const posList = icaoGroups[icao].sort((a, b) => (a.timestamp_utc || '').localeCompare(b.timestamp_utc || ''));
+            const posList = icaoGroups[icao].sort((a, b) => a.time_ms - b.time_ms);
             const latest = posList[posList.length - 1];
             const color = getAltitudeColor(latest.altitude_ft);
             const isCurrent = currentICAOs.has(icao);
 
             if (isCurrent) {{
-                const acInfo = getAircraftInfo(icao);
-
-                // Build popup with three sections
-                let popup = '<div style="font-family: -apple-system, BlinkMacSystemFont, sans-serif; font-size: 13px;">';
-
-                // Section 1: Aircraft Data (static info)
-                popup += '<table style="width: 100%; border-collapse: collapse; margin-bottom: 8px; table-layout: fixed;">';
-                popup += `<tr><td style="width: 50%; padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">ICAO</td><td style="width: 50%; padding: 2px 0; font-weight: 600; color: #fff;">${{latest.icao}}</td></tr>`;
-                if (latest.flight) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Flight</td><td style="padding: 2px 0; font-weight: 600; color: #fff;">${{latest.flight}}</td></tr>`;
-                if (acInfo && acInfo.registration) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Registration</td><td style="padding: 2px 0; color: #fff;">${{acInfo.registration}}</td></tr>`;
-                if (acInfo && acInfo.type) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Type</td><td style="padding: 2px 0; color: #fff;">${{acInfo.type}}</td></tr>`;
-                if (acInfo && acInfo.model) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Model</td><td style="padding: 2px 0; color: #fff;">${{acInfo.model}}</td></tr>`;
-                popup += '</table>';
-
-                // Divider
-                popup += '<hr style="border: none; border-top: 1px solid rgba(255,255,255,0.2); margin: 6px 0;">';
-
-                // Section 2: Live Data (dynamic info)
-                popup += '<table style="width: 100%; border-collapse: collapse; margin-bottom: 8px; table-layout: fixed;">';
-                if (latest.timestamp_utc) popup += `<tr><td style="width: 50%; padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Spotted</td><td style="width: 50%; padding: 2px 0; color: #fff;">${{formatTimeAgo(latest.timestamp_utc)}}</td></tr>`;
-                popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Distance</td><td style="padding: 2px 0; color: #fff;">${{formatDistance(calculate3DDistance(latest.lat, latest.lon, latest.altitude_ft))}}</td></tr>`;
-                if (latest.altitude_ft) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Altitude</td><td style="padding: 2px 0; color: #fff;">${{latest.altitude_ft.toLocaleString()}} ft <span style="color:rgba(255,255,255,0.5);">(${{Math.round(latest.altitude_ft * 0.3048).toLocaleString()}} m)</span></td></tr>`;
-                if (latest.speed_kts) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Speed</td><td style="padding: 2px 0; color: #fff;">${{Math.round(latest.speed_kts)}} kts <span style="color:rgba(255,255,255,0.5);">(${{Math.round(latest.speed_kts * 1.852)}} km/h)</span></td></tr>`;
-                if (latest.heading_deg != null) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Heading</td><td style="padding: 2px 0; color: #fff;">${{Math.round(latest.heading_deg)}}°</td></tr>`;
-                if (latest.squawk) popup += `<tr><td style="padding: 2px 4px 2px 0; color: rgba(255,255,255,0.6);">Squawk</td><td style="padding: 2px 0; color: #fff;">${{latest.squawk}}</td></tr>`;
-                popup += '</table>';
-
-                // Section 3: Tracking Links
-                popup += '<hr style="border: none; border-top: 1px solid rgba(255,255,255,0.2); margin: 6px 0;">';
-                popup += '<div style="text-align: center; padding-top: 2px;">';
-                popup += `<a href="https://globe.adsbexchange.com/?icao=${{latest.icao.toLowerCase()}}" target="_blank" style="color:#6cb8ff; text-decoration:none; margin-right: 12px;">ADSBexchange</a>`;
-                if (acInfo && acInfo.registration) {{
-                    popup += `<a href="https://www.flightradar24.com/data/aircraft/${{acInfo.registration.toLowerCase()}}" target="_blank" style="color:#6cb8ff; text-decoration:none;">FlightRadar24</a>`;
-                }}
-                popup += '</div>';
-                popup += '</div>';
+                const popup = buildPopup(latest);
 
                 if (currentMarkers[icao]) {{
                     currentMarkers[icao].setLatLng([latest.lat, latest.lon]);
                     currentMarkers[icao].setPopupContent(popup);
-                    currentMarkers[icao].setIcon(createSvgIcon(icao, latest.altitude_ft, latest.heading_deg));
+                    if (canvasMarkers) currentMarkers[icao].setStyle({{ fillColor: color }});
+                    else {{
+                        // setIcon rebuilds the marker's DOM node, so skip it when the icon is unchanged
+                        const icon = createSvgIcon(icao, latest.altitude_ft, latest.heading_deg);
+                        if (currentMarkers[icao].options.icon !== icon) currentMarkers[icao].setIcon(icon);
+                    }}
                 }} else {{
-                    const marker = L.marker([latest.lat, latest.lon], {{ icon: createSvgIcon(icao, latest.altitude_ft, latest.heading_deg) }}).bindPopup(popup);
+                    const marker = canvasMarkers
+                        ? L.circleMarker([latest.lat, latest.lon], {{
+                            renderer: MARKER_RENDERER, radius: 5, color: '#fff', weight: 1,
+                            fillColor: color, fillOpacity: 0.9
+                        }})
+                        : L.marker([latest.lat, latest.lon], {{ icon: createSvgIcon(icao, latest.altitude_ft, latest.heading_deg) }});
+                    marker.bindPopup(popup);
                     markerLayer.addLayer(marker);
                     currentMarkers[icao] = marker;
                 }}
             }}
 
             if (posList.length > 1) {{
-                // Draw each segment with color based on altitude (rainbow effect)
+                // A trajectory whose points did not change keeps its polylines,
+                // so Leaflet does not project all of its vertices again
+                drawnLines.add(icao);
+                const lineKey = posList.length + '|' + posList[0].time_ms + '|' + latest.time_ms + '|' + isCurrent;
+                const previous = currentLines[icao];
+                if (previous && previous.key === lineKey) return;
+                if (previous) removeLines(previous);
+
+                const tile = getLineTile(trajectoryBounds(posList));
+                // Color each segment by altitude (rainbow effect), joining
+                // same-colored runs into one multi-polyline per color
                 const lineOpacity = isCurrent ? 0.6 : 0.3;
-                const segments = [];
+                const runsByColor = {{}};
+                let run = null;
+                let runColor = null;
                 for (let i = 0; i < posList.length - 1; i++) {{
-                    const p1 = posList[i];
-                    const p2 = posList[i + 1];
-                    const segmentColor = getAltitudeColor(p1.altitude_ft);
-                    const segment = L.polyline([[p1.lat, p1.lon], [p2.lat, p2.lon]], {{
+                    const segmentColor = getAltitudeColor(posList[i].altitude_ft);
+                    if (segmentColor !== runColor) {{
+                        run = [[posList[i].lat, posList[i].lon]];
+                        runColor = segmentColor;
+                        (runsByColor[segmentColor] = runsByColor[segmentColor] || []).push(run);
+                    }}
+                    run.push([posList[i + 1].lat, posList[i + 1].lon]);
+                }}
+                const lines = [];
+                Object.keys(runsByColor).forEach(segmentColor => {{
+                    const runs = runsByColor[segmentColor];
+                    const lod = {{ runs: runs, levels: LINE_LOD_LEVELS.map(level => runs.map(run => simplifyIndices(run, level[1]))) }};
+                    const line = L.polyline(lineLatLngs(lod, lineLodLevel), {{
                         color: segmentColor,
                         weight: 3,
-                        opacity: lineOpacity
+                        opacity: lineOpacity,
+                        renderer: LINE_RENDERER
                     }});
-                    lineLayer.addLayer(segment);
-                    segments.push(segment);
-                }}
-                currentLines[icao] = segments;
+                    line.lod = lod;
+                    tile.group.addLayer(line);
+                    lines.push(line);
+                }});
+                tile.count++;
+                currentLines[icao] = {{ key: lineKey, tile: tile, lines: lines }};
             }}
         }});
+
+        Object.keys(currentLines).forEach(icao => {{
+            if (!drawnLines.has(icao)) {{
+                removeLines(currentLines[icao]);
+                delete currentLines[icao];
+            }}
+        }});
+        Object.keys(lineTiles).forEach(key => {{
+            const tile = lineTiles[key];
+            if (tile.count === 0) {{
+                tile.parent.removeLayer(tile.group);
+                delete lineTiles[key];
+            }} else {{
+                tile.bounds = L.latLngBounds([tile.box[0], tile.box[1]], [tile.box[2], tile.box[3]]);
+            }}
+        }});
+        refreshVisibleTiles();
+    }}
+
+    function removeLines(drawn) {{
+        drawn.lines.forEach(line => drawn.tile.group.removeLayer(line));
+        drawn.tile.count--;
     }}
     </script>
     '''
@@ -693,6 +1349,7 @@ def create_map(positions: List[Dict[str, Any]], output_path: str = None,
 
     # Save map
     m.save(output_path)
+    _last_map_digests[output_path] = digest
     print(f"Map saved to: {output_path}")
 
 
@@ -717,6 +1374,10 @@ Examples:
     parser.add_argument("--output", default=None, help="Output HTML file path")
     parser.add_argument("--title", default=None, help="Map title")
     parser.add_argument("--refresh", type=int, default=0, help="Auto-refresh interval in seconds")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Parse CSV files in chunks of N rows (lower memory for large histories)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parse large CSV files with N worker processes")
     parser.add_argument("--home-lat", type=float, default=None, help="Home position latitude")
     parser.add_argument("--home-lon", type=float, default=None, help="Home position longitude")
     parser.add_argument("--setup-home", action="store_true", help="Interactive home location setup")
@@ -759,27 +1420,17 @@ Examples:
 
     # Read positions
     print(f"Reading positions from: {csv_path}")
-    positions = read_csv_positions(csv_path)
+    positions = read_csv_positions(csv_path, args.chunksize, args.workers)
 
     # Merge historical trajectories if applicable
     if historical_csv_path and os.path.exists(historical_csv_path) and not args.historical:
         print(f"Loading historical trajectories from: {historical_csv_path}")
-        historical_positions = read_csv_positions(historical_csv_path)
+        historical_positions = read_csv_positions(historical_csv_path, args.chunksize, args.workers)
 
         if historical_positions:
-            current_icaos = set(p["icao"] for p in positions)
             show_all_history = not args.csv
-
-            for hist_pos in historical_positions:
-                if show_all_history or hist_pos["icao"] in current_icaos:
-                    is_duplicate = any(
-                        p["icao"] == hist_pos["icao"] and
-                        abs(p["lat"] - hist_pos["lat"]) < 0.0001 and
-                        abs(p["lon"] - hist_pos["lon"]) < 0.0001
-                        for p in positions
-                    )
-                    if not is_duplicate:
-                        positions.append(hist_pos)
+            current_icaos = None if show_all_history else set(p["icao"] for p in positions)
+            merge_historical_positions(positions, historical_positions, current_icaos)
 
             print(f"Loaded {len(historical_positions)} historical positions")
 
@@ -813,15 +1464,13 @@ Examples:
             current_icaos_for_map = set(p["icao"] for p in current_only)
 
             # Ensure current positions are in the data
-            for icao, current_pos in {p["icao"]: p for p in current_only}.items():
-                is_duplicate = any(
-                    p["icao"] == icao and
-                    abs(p["lat"] - current_pos["lat"]) < 0.0001 and
-                    abs(p["lon"] - current_pos["lon"]) < 0.0001
-                    for p in positions
-                )
-                if not is_duplicate:
-                    positions.insert(0, current_pos)
+            index = PositionIndex(positions)
+            missing = [current_pos for current_pos in {p["icao"]: p for p in current_only}.values()
+                       if not index.has_near(current_pos)]
+            # Prepended in one step, in the order repeated insert(0) gave: the
+            # stable sort in group_trajectories keeps list order for fixes with
+            # equal timestamps, so this order decides which one ends a trajectory
+            positions = missing[::-1] + positions
 
     # Set home position from args
     if args.home_lat and args.home_lon:
@@ -2,17 +2,30 @@
 """
 HTTP Server for ADS-B Map
 
-Serves the map HTML and JSON data files via HTTP to avoid CORS issues.
+Serves the map HTML and binary data files via HTTP to avoid CORS issues.
 This allows the map to fetch updates dynamically without page reload.
 
+Clients that accept gzip get a compressed copy, cached next to each file as
+<name>.gz and refreshed whenever the file changes.
+
+Runs on uvicorn when it is installed (with starlette, which FastAPI brings in),
+and on the standard library's http.server otherwise.
+
 Usage:
-    python -m apps.serve_map [--port 8000] [--host 127.0.0.1]
+    python -m apps.serve_map [--port 8000] [--host 127.0.0.1] [--stdlib]
 """
 
 import argparse
+import gzip
+import html
 import http.server
-import socketserver
+import io
+import mimetypes
+import os
+import socket
 import sys
+import threading
+import urllib.parse
 
 try:
     from . import _bootstrap  # noqa: F401
@@ -22,6 +35,88 @@ except ImportError:  # pragma: no cover
 from adsb.config import OUTPUT_DIR
 
 
+# Content types missing from the mimetypes defaults
+CONTENT_TYPES = {
+    '.bin': 'application/octet-stream',
+}
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+}
+
+# Files sent gzip-compressed to clients that accept it; the map HTML and
+# data files shrink four to five times even at the fastest level
+GZIP_SUFFIXES = ('.html', '.json', '.js', '.css', '.svg', '.bin')
+GZIP_LEVEL = 1
+
+
+def file_headers(request_path):
+    """Caching headers for a served file, on top of the CORS headers."""
+    headers = {}
+    # Map data files are rewritten every few seconds; never reuse a stale copy
+    if request_path.endswith('_data.bin'):
+        headers['Cache-Control'] = 'no-store'
+    if request_path.endswith(GZIP_SUFFIXES):
+        headers['Vary'] = 'Accept-Encoding'
+    return headers
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header value allows a gzip response."""
+    wildcard = None
+    for item in (accept_encoding or '').split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        coding = coding.lower()
+        if coding in ('gzip', 'x-gzip'):
+            return q > 0
+        if coding == '*':
+            wildcard = q > 0
+    # "*" covers codings the client did not list by name
+    return bool(wildcard)
+
+
+def gzip_copy(path):
+    """Path of an up-to-date gzip copy of path, or None if it cannot be written."""
+    gz_path = path + '.gz'
+    try:
+        source_stat = os.stat(path)
+        # The copy carries the mtime of the source it was made from
+        if os.stat(gz_path).st_mtime_ns == source_stat.st_mtime_ns:
+            return gz_path
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return None
+
+    tmp_path = f'{gz_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(tmp_path, 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=GZIP_LEVEL))
+        # Stamp the mtime seen before reading, so a source rewritten
+        # meanwhile no longer matches and is compressed again
+        os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp_path, gz_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return None
+    return gz_path
+
+
 class CORSRequestHandler(http.server.SimpleHTTPRequestHandler):
     """HTTP request handler with CORS headers."""
 
@@ -29,12 +124,56 @@ class CORSRequestHandler(http.server.SimpleHTTPRequestHandler):
         # Serve files from the output directory
         super().__init__(*args, directory=str(OUTPUT_DIR), **kwargs)
 
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        **CONTENT_TYPES,
+    }
+
     def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        headers = {**CORS_HEADERS, **file_headers(self.path.split('?', 1)[0])}
+        for name, value in headers.items():
+            self.send_header(name, value)
         super().end_headers()
 
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if (path.endswith(GZIP_SUFFIXES) and os.path.isfile(path)
+                and accepts_gzip(self.headers.get('Accept-Encoding'))):
+            gz_path = gzip_copy(path)
+            if gz_path is not None:
+                try:
+                    f = open(gz_path, 'rb')
+                except OSError:
+                    return super().send_head()
+                stat = os.fstat(f.fileno())
+                self.send_response(200)
+                self.send_header('Content-type', self.guess_type(path))
+                self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(stat.st_size))
+                self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+                self.end_headers()
+                return f
+        return super().send_head()
+
+    def copyfile(self, source, outputfile):
+        # Let the kernel move file bodies to the socket instead of copying
+        # them through Python buffers
+        try:
+            in_fd = source.fileno()
+            out_fd = outputfile.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            in_fd = out_fd = None
+        if in_fd is None or not hasattr(os, 'sendfile'):
+            super().copyfile(source, outputfile)
+            return
+        offset = source.tell()
+        size = os.fstat(in_fd).st_size
+        while offset < size:
+            sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+            if not sent:
+                break
+            offset += sent
+
     def do_OPTIONS(self):
         self.send_response(200)
         self.end_headers()
@@ -44,6 +183,99 @@ class CORSRequestHandler(http.server.SimpleHTTPRequestHandler):
         pass
 
 
+def directory_listing(path, request_path):
+    """HTML listing of a directory, in the style of http.server's."""
+    names = sorted(os.listdir(path), key=str.lower)
+    title = html.escape(f'Directory listing for {urllib.parse.unquote(request_path)}')
+    items = []
+    for name in names:
+        display = name + '/' if os.path.isdir(os.path.join(path, name)) else name
+        items.append(f'<li><a href="{urllib.parse.quote(display)}">{html.escape(display)}</a></li>')
+    return (f'<!DOCTYPE HTML>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{title}</title>\n</head>\n<body>\n<h1>{title}</h1>\n<hr>\n'
+            f'<ul>\n' + '\n'.join(items) + '\n</ul>\n<hr>\n</body>\n</html>\n')
+
+
+def create_asgi_app():
+    """
+    Starlette app serving the output directory like CORSRequestHandler.
+
+    Directories are served as their index.html or, failing that, a listing.
+    Requires starlette; file bodies are streamed by the ASGI server.
+    """
+    from starlette.applications import Starlette
+    from starlette.concurrency import run_in_threadpool
+    from starlette.responses import FileResponse, HTMLResponse, RedirectResponse, Response
+    from starlette.routing import Route
+
+    root = os.path.realpath(str(OUTPUT_DIR))
+
+    async def serve_file(request):
+        if request.method == 'OPTIONS':
+            return Response(headers=CORS_HEADERS)
+        path = os.path.realpath(os.path.join(root, request.path_params['path']))
+        if os.path.commonpath([root, path]) == root and os.path.isdir(path):
+            # Relative links in the listing need the trailing slash
+            if not request.url.path.endswith('/'):
+                location = request.url.path + '/'
+                if request.url.query:
+                    location += '?' + request.url.query
+                return RedirectResponse(location, status_code=301, headers=CORS_HEADERS)
+            index = os.path.join(path, 'index.html')
+            if not os.path.isfile(index):
+                try:
+                    body = await run_in_threadpool(directory_listing, path, request.url.path)
+                except OSError:
+                    return Response('No permission to list directory', status_code=404,
+                                    headers=CORS_HEADERS)
+                return HTMLResponse(body, headers=CORS_HEADERS)
+            path = index
+        if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+            return Response('File not found', status_code=404, headers=CORS_HEADERS)
+
+        headers = {**CORS_HEADERS, **file_headers(request.url.path)}
+        ext = os.path.splitext(path)[1].lower()
+        media_type = CONTENT_TYPES.get(ext) or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if path.endswith(GZIP_SUFFIXES) and accepts_gzip(request.headers.get('accept-encoding')):
+            gz_path = await run_in_threadpool(gzip_copy, path)
+            if gz_path is not None:
+                headers['Content-Encoding'] = 'gzip'
+                return FileResponse(gz_path, headers=headers, media_type=media_type)
+        return FileResponse(path, headers=headers, media_type=media_type)
+
+    return Starlette(routes=[Route('/{path:path}', serve_file, methods=['GET', 'HEAD', 'OPTIONS'])])
+
+
+def _serve_stdlib(host, port):
+    # One thread per connection, so a slow client does not hold up the others
+    with http.server.ThreadingHTTPServer((host, port), CORSRequestHandler) as httpd:
+        _print_banner(host, port, "http.server")
+        httpd.serve_forever()
+
+
+def _serve_uvicorn(uvicorn, host, port):
+    # Bind here so a busy port fails the same way as with http.server
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind((host, port))
+    except OSError:
+        sock.close()
+        raise
+    _print_banner(host, port, "uvicorn")
+    # uvicorn shuts down cleanly on Ctrl+C before returning or re-raising it
+    server = uvicorn.Server(uvicorn.Config(create_asgi_app(), log_level="warning"))
+    server.run(sockets=[sock])
+
+
+def _print_banner(host, port, server_name):
+    print(f"Serving ADS-B map files from: {OUTPUT_DIR}")
+    print(f"Server running at http://{host}:{port} ({server_name})")
+    print(f"Open http://{host}:{port}/adsb_map.html in your browser")
+    print("Press Ctrl+C to stop")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Serve ADS-B map files via HTTP",
@@ -53,21 +285,35 @@ Examples:
   python -m apps.serve_map               # Serve on default port 8000
   python -m apps.serve_map --port 8080   # Serve on custom port
   python -m apps.serve_map --host 0.0.0.0  # Serve on all interfaces
+  python -m apps.serve_map --stdlib      # Use http.server even if uvicorn is installed
+
+Both servers list the output directory at / (or serve its index.html),
+linking to the generated maps.
         """
     )
 
     parser.add_argument("--port", type=int, default=8000, help="Port to serve on (default: 8000)")
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind to (default: 127.0.0.1)")
+    parser.add_argument("--stdlib", action="store_true",
+                        help="Serve with http.server even when uvicorn is installed")
 
     args = parser.parse_args()
 
+    uvicorn = None
+    if not args.stdlib:
+        try:
+            import starlette  # noqa: F401
+            import uvicorn
+        except ImportError:
+            uvicorn = None
+
     try:
-        with socketserver.TCPServer((args.host, args.port), CORSRequestHandler) as httpd:
-            print(f"Serving ADS-B map files from: {OUTPUT_DIR}")
-            print(f"Server running at http://{args.host}:{args.port}")
-            print(f"Open http://{args.host}:{args.port}/adsb_map.html in your browser")
-            print("Press Ctrl+C to stop")
-            httpd.serve_forever()
+        if uvicorn is not None:
+            _serve_uvicorn(uvicorn, args.host, args.port)
+        else:
+            _serve_stdlib(args.host, args.port)
+    except KeyboardInterrupt:
+        pass
     except OSError as e:
         if "Address already in use" in str(e):
             print(f"Error: Port {args.port} is already in use.", file=sys.stderr)
@@ -75,8 +321,7 @@ Examples:
         else:
             print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
-    except KeyboardInterrupt:
-        print("\n\nServer stopped.")
+    print("\n\nServer stopped.")
 
 
 if __name__ == "__main__":
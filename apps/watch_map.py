@@ -3,6 +3,8 @@
 Watch and auto-update map from ADS-B CSV files.
 
 Continuously regenerates the map HTML file as new positions are captured.
+With watchdog installed the CSV files are watched through the OS file
+notification API (inotify, FSEvents, ...); otherwise they are polled.
 
 Usage:
     python -m apps.watch_map              # Watch current positions
@@ -12,7 +14,9 @@ Usage:
 
 import argparse
 import os
+import threading
 import time
+from typing import Any, Dict, List, Tuple
 
 try:
     from . import _bootstrap  # noqa: F401
@@ -23,7 +27,186 @@ from adsb.config import (
     get_history_csv_path, get_current_csv_path,
     DEFAULT_MAP_HTML, DEFAULT_CURRENT_MAP_HTML,
 )
-from apps.plot_map import read_csv_positions, create_map
+from adsb.adsb import merge_historical_positions
+from apps.plot_map import create_map, parse_csv_bytes, update_map_data
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+
+# Re-render the full HTML at least this often (seconds) even when only the
+# data file changes, so a page opened from disk is never far behind
+FULL_RENDER_INTERVAL = 60
+
+# File events closer together than this (seconds) trigger a single update
+DEBOUNCE_SECONDS = 0.2
+
+# Longest wait for a file event (seconds), in case an event was dropped
+EVENT_WAIT_TIMEOUT = 60
+
+# watchdog event types that mean a file's content may have changed; opened
+# and closed_no_write events, which the watcher's own reads generate, are not
+CHANGE_EVENT_TYPES = frozenset({"modified", "created", "moved", "deleted", "closed"})
+
+
+def _files_signature(*paths) -> Tuple:
+    """Return (mtime_ns, size) per path, None for missing files."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path) if path else None
+        except OSError:
+            stat = None
+        signature.append((stat.st_mtime_ns, stat.st_size) if stat else None)
+    return tuple(signature)
+
+
+class FileChangeWaiter:
+    """
+    Block until one of the watched files may have changed.
+
+    With watchdog, waits for a file system event on one of the paths and
+    lets a burst of writes settle before returning, so an idle watcher never
+    wakes up; returns are still at least `interval` seconds apart, so busy
+    traffic does not update any faster than polling would. Without watchdog,
+    or when no parent directory exists yet, sleeps for the poll interval.
+    """
+
+    def __init__(self, paths, interval: float):
+        self.interval = interval
+        self._last_wake = time.monotonic()
+        self._changed = threading.Event()
+        self._observer = None
+        if not WATCHDOG_AVAILABLE:
+            return
+
+        watched = {os.path.abspath(str(p)) for p in paths if p}
+        directories = {os.path.dirname(p) for p in watched}
+        if not all(os.path.isdir(d) for d in directories):
+            return
+        changed = self._changed
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory or event.event_type not in CHANGE_EVENT_TYPES:
+                    return
+                # Rewrites may land as a rename onto the watched path
+                if (os.path.abspath(event.src_path) in watched
+                        or os.path.abspath(getattr(event, "dest_path", "") or "") in watched):
+                    changed.set()
+
+        observer = Observer()
+        observer.daemon = True
+        for directory in directories:
+            observer.schedule(Handler(), directory, recursive=False)
+        observer.start()
+        self._observer = observer
+
+    @property
+    def uses_events(self) -> bool:
+        return self._observer is not None
+
+    def wait(self) -> None:
+        if self._observer is None:
+            time.sleep(self.interval)
+            return
+        if self._changed.wait(EVENT_WAIT_TIMEOUT):
+            elapsed = time.monotonic() - self._last_wake
+            time.sleep(max(DEBOUNCE_SECONDS, self.interval - elapsed))
+            self._changed.clear()
+        self._last_wake = time.monotonic()
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+
+class CsvTail:
+    """
+    Cached positions of a CSV file that only parses what changed since the
+    previous read.
+
+    The history CSV only ever grows, so with append_only most ticks parse a
+    handful of new rows. A file that is replaced, shrinks, or whose bytes just
+    before the last offset change is parsed again from the start.
+
+    The current-positions CSV is rewritten in place and any of its rows may
+    change without touching the end of the file, so it is read with
+    append_only=False: the whole file is read each time and parsed again
+    whenever its bytes differ from the previous read.
+    """
+
+    # Bytes before the offset compared to tell an append from a rewrite
+    _ANCHOR_BYTES = 256
+
+    def __init__(self, path: str, append_only: bool = True):
+        self.path = path
+        self.append_only = append_only
+        self._reset(None)
+
+    def _reset(self, inode) -> None:
+        self._inode = inode
+        self._header = b""
+        self._offset = 0
+        self._anchor = b""
+        self._data = b""
+        self._positions: List[Dict[str, Any]] = []
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Return all positions in the file, parsing only what is new."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._reset(None)
+            return []
+        if not self.append_only:
+            return self._read_whole()
+
+        with open(self.path, "rb") as f:
+            if (stat.st_ino != self._inode or stat.st_size < self._offset
+                    or not self._header or not self._anchor_matches(f)):
+                self._reset(stat.st_ino)
+                f.seek(0)
+                header = f.readline()
+                if not header.endswith(b"\n"):
+                    return []  # empty, or the header is still being written
+                self._header = header
+                self._offset = f.tell()
+            f.seek(self._offset)
+            data = f.read()
+
+        # Leave a partially written last line for the next tick
+        end = data.rfind(b"\n") + 1
+        if end:
+            start = self._offset
+            self._positions.extend(parse_csv_bytes(self._header + data[:end],
+                                                   f"{self.path} (bytes {start}-{start + end})"))
+            self._offset += end
+            self._anchor = data[max(0, end - self._ANCHOR_BYTES):end]
+        # Copies, since callers append merged history to the list and fill in
+        # headings on the records
+        return [dict(p) for p in self._positions]
+
+    def _read_whole(self) -> List[Dict[str, Any]]:
+        with open(self.path, "rb") as f:
+            data = f.read()
+        # A rewrite caught halfway is parsed up to its last complete line
+        data = data[:data.rfind(b"\n") + 1]
+        if data != self._data:
+            self._positions = parse_csv_bytes(data, self.path) if data else []
+            self._data = data
+        return [dict(p) for p in self._positions]
+
+    def _anchor_matches(self, f) -> bool:
+        if not self._anchor:
+            return True
+        f.seek(self._offset - len(self._anchor))
+        return f.read(len(self._anchor)) == self._anchor
 
 
 def watch_and_update(csv_path: str, output_path: str = None,
@@ -32,41 +215,55 @@ def watch_and_update(csv_path: str, output_path: str = None,
     if output_path is None:
         output_path = str(DEFAULT_MAP_HTML)
 
-    print(f"Watching {csv_path}")
-    print(f"Updating {output_path} every {interval} second{'s' if interval != 1 else ''}...")
-    print("Press Ctrl+C to stop.")
-    print()
-
     # Determine historical CSV path for merging trajectories
     historical_csv_path = None
     if not historical:
         historical_csv_path = str(get_history_csv_path())
 
+    # Historical maps mark no current aircraft, so the current CSV is not read
+    current_csv_path = get_current_csv_path() if not historical else None
+    waiter = FileChangeWaiter([csv_path, historical_csv_path, current_csv_path], interval)
+
+    print(f"Watching {csv_path}")
+    if waiter.uses_events:
+        print(f"Updating {output_path} when the CSV files change, "
+              f"at most every {interval} second{'s' if interval != 1 else ''}...")
+    else:
+        print(f"Updating {output_path} every {interval} second{'s' if interval != 1 else ''}...")
+    print("Press Ctrl+C to stop.")
+    print()
+    last_signature = None
+    last_render_key = None
+    last_render_time = 0.0
+    # One tail per distinct file; the watched CSV is usually the current one.
+    # Only the history CSV is append-only, the others are rewritten in place.
+    tails: Dict[str, CsvTail] = {}
+    append_only_path = os.path.abspath(str(get_history_csv_path()))
+
+    def read_positions(path) -> List[Dict[str, Any]]:
+        path = str(path)
+        if path not in tails:
+            tails[path] = CsvTail(path, append_only=os.path.abspath(path) == append_only_path)
+        return tails[path].read()
+
     try:
         while True:
-            positions = []
-            if os.path.exists(csv_path):
-                positions = read_csv_positions(csv_path)
+            # Skip the whole read/merge/render pipeline while no input changed
+            signature = _files_signature(csv_path, historical_csv_path, current_csv_path)
+            if signature == last_signature:
+                waiter.wait()
+                continue
+            last_signature = signature
+
+            positions = read_positions(csv_path)
 
             # Merge historical data for trajectories
             if positions and historical_csv_path and os.path.exists(historical_csv_path) and not historical:
-                historical_positions = read_csv_positions(historical_csv_path)
+                historical_positions = read_positions(historical_csv_path)
 
                 if historical_positions:
                     current_icaos = set(p["icao"] for p in positions)
-
-                    for hist_pos in historical_positions:
-                        if hist_pos["icao"] in current_icaos:
-                            is_duplicate = any(
-                                p["icao"] == hist_pos["icao"] and
-                                abs(p["lat"] - hist_pos["lat"]) < 0.0001 and
-                                abs(p["lon"] - hist_pos["lon"]) < 0.0001
-                                for p in positions
-                            )
-                            if not is_duplicate:
-                                positions.append(hist_pos)
-                        else:
-                            positions.append(hist_pos)
+                    merge_historical_positions(positions, historical_positions, current_icaos, keep_others=True)
 
             if positions:
                 title = "ADS-B Current Positions with Trajectories" if not historical else "ADS-B Historical Positions"
@@ -74,20 +271,32 @@ def watch_and_update(csv_path: str, output_path: str = None,
                 # Determine current ICAOs for marker display
                 current_icaos_for_map = set()
                 if not historical:
-                    current_csv_path = get_current_csv_path()
                     if current_csv_path.exists():
-                        current_only = read_csv_positions(str(current_csv_path))
+                        current_only = read_positions(current_csv_path)
                         current_icaos_for_map = set(p["icao"] for p in current_only)
 
-                create_map(positions, output_path, title, refresh_interval=0, current_icaos=current_icaos_for_map)
-                print(f"Map updated: {len(positions)} positions, {len(set(p['icao'] for p in positions))} aircraft")
+                # The page redraws markers and lines from the data file, so the
+                # HTML only needs rendering when the aircraft it marks change.
+                render_key = frozenset(current_icaos_for_map)
+                now = time.monotonic()
+                if (render_key == last_render_key
+                        and now - last_render_time < FULL_RENDER_INTERVAL and os.path.exists(output_path)):
+                    update_map_data(positions, output_path)
+                    print(f"Map data updated: {len(positions)} positions")
+                else:
+                    create_map(positions, output_path, title, refresh_interval=0, current_icaos=current_icaos_for_map)
+                    last_render_key = render_key
+                    last_render_time = now
+                    print(f"Map updated: {len(positions)} positions, {len(set(p['icao'] for p in positions))} aircraft")
             else:
                 print("No positions found, skipping update...")
 
-            time.sleep(interval)
+            waiter.wait()
 
     except KeyboardInterrupt:
         print(f"\n\nStopped.")
+    finally:
+        waiter.stop()
 
 
 def main():
@@ -105,7 +314,9 @@ Examples:
     parser.add_argument("--csv", default=None, help="Path to CSV file")
     parser.add_argument("--historical", action="store_true", help="Watch historical CSV file")
     parser.add_argument("--output", default=None, help="Output HTML file path")
-    parser.add_argument("--interval", type=int, default=1, help="Update interval in seconds (default: 1)")
+    parser.add_argument("--interval", type=int, default=1,
+                        help="Minimum seconds between updates; without watchdog, the poll "
+                             "interval (default: 1)")
 
     args = parser.parse_args()
 
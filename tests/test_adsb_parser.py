@@ -7,7 +7,9 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from adsb.adsb import AircraftStateTracker, ParsedMessage, parse_sbs_line  # noqa: E402
+from adsb.adsb import (  # noqa: E402
+    AircraftStateTracker, ParsedMessage, merge_historical_positions, parse_sbs_line, parse_sbs_lines,
+)
 
 
 def test_parse_sbs_line_with_position():
@@ -68,3 +70,45 @@ def test_tracker_merges_partial_messages():
     assert has_full is True
     assert pos_record["speed_kts"] == 250.0
     assert pos_record["heading_deg"] == 90.0
+
+
+def test_parse_sbs_lines_skips_unusable_lines():
+    lines = [
+        "SEL,,496,2286,4CA4E5,27215,2010/02/19,18:06:07.710,2010/02/19,18:06:07.710,RYR1427\n",
+        "MSG,3,111,11111,3C5EF2,111111,2025/12/07,17:01:58.200,2025/12/07,17:01:58.400,,38000,,,45.630,8.936,,,0,0,0,0\n",
+        "\n",
+        " MSG,4,111,11111,3C5EF2,111111,2025/12/07,17:01:59.200,2025/12/07,17:01:59.400,,,376,158,,,0,,0,0,0,0\n",
+        "MSG,1,111,11111,,111111,2025/12/07,17:02:00.200,2025/12/07,17:02:00.400,EWG4TV,,,,,,,,,,,\n",
+    ]
+    expected = [parse_sbs_line(line) for line in lines]
+    assert list(parse_sbs_lines(lines)) == [msg for msg in expected if msg is not None]
+    assert [msg.transmission_type for msg in parse_sbs_lines(lines)] == [3, 4]
+
+
+def test_tracker_uses_supplied_timestamp():
+    tracker = AircraftStateTracker()
+    msg = ParsedMessage(raw="MSG,3,,,", message_type="MSG", transmission_type=3, icao="ABC123", lat=40.0, lon=-3.0)
+    tracker.update(msg, now_iso="2025-12-07T17:01:58+00:00")
+    snapshot = tracker.latest_snapshot()
+    assert snapshot["ABC123"]["timestamp_utc"] == "2025-12-07T17:01:58+00:00"
+
+
+def test_merge_historical_positions_skips_near_duplicates():
+    positions = [{"icao": "AAA111", "lat": 45.0, "lon": 9.0}]
+    history = [
+        {"icao": "AAA111", "lat": 45.00005, "lon": 9.00005},  # same fix
+        {"icao": "AAA111", "lat": 45.001, "lon": 9.0},
+        {"icao": "AAA111", "lat": 45.00101, "lon": 9.0},  # duplicate of the point above
+        {"icao": "BBB222", "lat": 45.0, "lon": 9.0},
+    ]
+    merged = list(positions)
+    merge_historical_positions(merged, history)
+    assert merged == positions + [history[1], history[3]]
+
+    merged = list(positions)
+    merge_historical_positions(merged, history, icaos={"AAA111"})
+    assert merged == positions + [history[1]]
+
+    merged = list(positions)
+    merge_historical_positions(merged, history, icaos={"AAA111"}, keep_others=True)
+    assert merged == positions + [history[1], history[3]]
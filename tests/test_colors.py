@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from adsb.colors import get_altitude_color, get_altitude_colors, get_altitude_hex_color  # noqa: E402
+
+
+def test_get_altitude_color_snaps_to_nearest_stop():
+    assert get_altitude_color(None) == "gray"
+    assert get_altitude_color(-500) == "orange"
+    assert get_altitude_color(1999) == "orange"
+    assert get_altitude_color(2000) == "lightred"
+    assert get_altitude_color(13999) == "green"
+    assert get_altitude_color(14000) == "lightblue"
+    assert get_altitude_color(34999.5) == "blue"
+    assert get_altitude_color(45000) == "purple"
+
+
+def test_get_altitude_colors_matches_scalar_lookup():
+    altitudes = [None, 0, 4000, 8000, 19999, 25000, 30000, 40000]
+    assert get_altitude_colors(altitudes) == [get_altitude_color(a) for a in altitudes]
+    assert get_altitude_colors(a for a in ()) == []
+
+
+def test_nan_altitude_is_unknown():
+    nan = float("nan")
+    assert get_altitude_color(nan) == "gray"
+    assert get_altitude_colors([nan, 0]) == ["gray", "orange"]
+    assert get_altitude_hex_color(nan) == "#808080"
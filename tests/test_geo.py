@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from adsb.geo import simplify_path_indices  # noqa: E402
+
+
+def test_simplify_path_indices_keeps_corners_and_endpoints():
+    path = [(45.0, 9.0), (45.0001, 9.1), (45.0, 9.2), (45.3, 9.3), (45.0, 9.4)]
+    assert simplify_path_indices(path, 0.01) == [0, 2, 3, 4]
+    assert simplify_path_indices(path, 0.0) == [0, 1, 2, 3, 4]
+    assert simplify_path_indices(path, 1.0) == [0, 4]
+    assert simplify_path_indices(path[:2], 1.0) == [0, 1]
+    assert simplify_path_indices([], 1.0) == []
@@ -0,0 +1,17 @@
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from adsb import jsonio  # noqa: E402
+
+
+def test_dumps_is_compact_and_round_trips():
+    record = {"icao": "3C5EF2", "lat": 45.46421, "lon": 9.18951, "altitude_ft": 35000, "speed_kts": None}
+    encoded = jsonio.dumps_bytes([record])
+    assert b" " not in encoded
+    assert json.loads(encoded) == [record]
+    assert jsonio.dumps(record) == encoded.decode("utf-8")[1:-1]
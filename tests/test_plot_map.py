@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps import plot_map  # noqa: E402
+
+HEADER = "timestamp_utc,icao,flight,lat,lon,altitude_ft,speed_kts,heading_deg,squawk\n"
+
+
+@pytest.mark.parametrize("content", [
+    "",
+    HEADER,
+    HEADER + "2026-01-01T00:00:00Z,ABC123,FL1,45.1,9.1,1000,200,90,1234,extra\n"
+             "2026-01-01T00:00:01Z,ABC124,FL2,45.2,9.2,,,,\n",
+    HEADER + "2026-01-01T00:00:00Z,ABC123,FL1,45.1,9.1,1000.7,200,90,1234\n"
+             "2026-01-01T00:00:01Z,ABC123,FL1,45.2,bad,1000,200,90,1234\n"
+             "2026-01-01T00:00:02Z,ABC123,FL1,45.3,9.3,1000,fast,90,1234\n"
+             "2026-01-01T00:00:03Z,,FL1,45.4,9.4,1000,200,90,1234\n",
+], ids=["empty", "header-only", "extra-fields", "bad-numeric"])
+def test_pandas_and_stdlib_readers_agree(tmp_path, content):
+    np = pytest.importorskip("numpy")
+    pd = pytest.importorskip("pandas")
+    csv_path = tmp_path / "positions.csv"
+    csv_path.write_text(content, encoding="utf-8")
+
+    expected = list(plot_map._iter_csv_positions_stdlib(str(csv_path)))
+    assert list(plot_map._iter_csv_positions_pandas(np, pd, str(csv_path), None)) == expected
+    assert list(plot_map._iter_csv_positions_pandas(np, pd, str(csv_path), 1)) == expected
+    assert plot_map.parse_csv_bytes(content.encode("utf-8"), "positions.csv") == expected
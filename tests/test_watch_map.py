@@ -0,0 +1,136 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.watch_map import WATCHDOG_AVAILABLE, CsvTail, FileChangeWaiter  # noqa: E402
+
+HEADER = "timestamp_utc,icao,flight,lat,lon,altitude_ft,speed_kts,heading_deg,squawk\n"
+
+
+def row(icao, lat, second=0):
+    return f"2026-01-01T00:00:{second:02d}Z,{icao},FL1,{lat},9.0,1000,200,,1234\n"
+
+
+def icaos(positions):
+    return [p["icao"] for p in positions]
+
+
+def test_csv_tail_reads_appended_rows_and_waits_for_complete_lines(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text(HEADER + row("AAA001", 45.0))
+    tail = CsvTail(str(path))
+    assert icaos(tail.read()) == ["AAA001"]
+
+    with open(path, "a") as f:
+        f.write(row("AAA002", 45.1) + row("AAA003", 45.2)[:20])
+    assert icaos(tail.read()) == ["AAA001", "AAA002"]
+
+    with open(path, "a") as f:
+        f.write(row("AAA003", 45.2)[20:])
+    assert icaos(tail.read()) == ["AAA001", "AAA002", "AAA003"]
+    assert icaos(tail.read()) == ["AAA001", "AAA002", "AAA003"]
+
+
+def test_csv_tail_rereads_files_rewritten_in_place(tmp_path):
+    path = tmp_path / "positions.csv"
+    path.write_text(HEADER + row("AAA001", 45.0) + row("AAA002", 45.1))
+    tail = CsvTail(str(path))
+    inode = os.stat(path).st_ino
+    assert icaos(tail.read()) == ["AAA001", "AAA002"]
+
+    # Shorter rewrite
+    with open(path, "w") as f:
+        f.write(HEADER + row("BBB001", 46.0))
+    assert os.stat(path).st_ino == inode
+    assert icaos(tail.read()) == ["BBB001"]
+
+    # Longer rewrite whose bytes before the old offset differ
+    with open(path, "w") as f:
+        f.write(HEADER + row("CCC001", 47.0) + row("CCC002", 47.1))
+    assert icaos(tail.read()) == ["CCC001", "CCC002"]
+
+    # Truncated and not yet rewritten
+    open(path, "w").close()
+    assert tail.read() == []
+
+
+def test_csv_tail_rereads_replaced_files(tmp_path):
+    path = tmp_path / "positions.csv"
+    path.write_text(HEADER + row("AAA001", 45.0))
+    tail = CsvTail(str(path))
+    assert icaos(tail.read()) == ["AAA001"]
+
+    # Same content and size, but a different file moved onto the path
+    replacement = tmp_path / "positions.csv.tmp"
+    replacement.write_text(HEADER + row("AAA001", 45.0) + row("BBB001", 46.0))
+    keep_inode_alive = open(path)
+    try:
+        os.replace(replacement, path)
+        assert icaos(tail.read()) == ["AAA001", "BBB001"]
+    finally:
+        keep_inode_alive.close()
+
+    os.remove(path)
+    assert tail.read() == []
+
+
+def test_csv_tail_rereads_rewritten_rows_when_not_append_only(tmp_path):
+    path = tmp_path / "current.csv"
+    # Enough later rows that the first one lies outside the append anchor
+    others = "".join(row(f"BBB{i:03d}", 46.0) for i in range(10))
+    path.write_text(HEADER + row("AAA001", 45.0) + others)
+    tail = CsvTail(str(path), append_only=False)
+    assert tail.read()[0]["lat"] == 45.0
+
+    # Same length, same trailing bytes, only the first row changed
+    with open(path, "w") as f:
+        f.write(HEADER + row("AAA001", 45.5, second=1) + others)
+    positions = tail.read()
+    assert (positions[0]["lat"], positions[0]["timestamp_utc"]) == (45.5, "2026-01-01T00:00:01Z")
+    assert len(positions) == 11
+
+    # A new aircraft, half written, along with an update to the first row
+    with open(path, "w") as f:
+        f.write(HEADER + row("AAA001", 45.6, second=2) + others + row("CCC001", 47.0)[:20])
+    assert [p["lat"] for p in tail.read()] == [45.6] + [46.0] * 10
+    with open(path, "a") as f:
+        f.write(row("CCC001", 47.0)[20:])
+    assert [p["lat"] for p in tail.read()] == [45.6] + [46.0] * 10 + [47.0]
+
+    open(path, "w").close()
+    assert tail.read() == []
+
+
+def test_csv_tail_returns_copies_of_cached_records(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text(HEADER + row("AAA001", 45.0))
+    tail = CsvTail(str(path))
+    positions = tail.read()
+    positions[0]["heading_deg"] = 90.0
+    positions.append({"icao": "EXTRA"})
+
+    assert tail.read() == [{**positions[0], "heading_deg": None}]
+
+
+@pytest.mark.skipif(not WATCHDOG_AVAILABLE, reason="watchdog is not installed")
+def test_file_change_waiter_ignores_its_own_reads(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text(HEADER + row("AAA001", 45.0))
+    waiter = FileChangeWaiter([path], interval=1)
+    try:
+        assert waiter.uses_events
+        CsvTail(str(path)).read()
+        CsvTail(str(path), append_only=False).read()
+        assert not waiter._changed.wait(0.5)
+
+        with open(path, "a") as f:
+            f.write(row("AAA002", 45.1))
+        assert waiter._changed.wait(2)
+    finally:
+        waiter.stop()